@@ -0,0 +1,118 @@
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MAIN = os.path.join(ROOT, "main.py")
+
+from bench_sync import summarize, compare
+
+
+def make_config(work, libraries):
+    libs = []
+    for i in range(libraries):
+        base = os.path.join(work, f"lib{i}")
+        libs.append({
+            "name": f"lib{i}",
+            "src": base,
+            "build_output": os.path.join(base, "dist"),
+            "build_command": "ng build",
+            "destinations": [os.path.join(work, f"app{j}", "node_modules", f"lib{i}") for j in range(2)],
+        })
+    os.makedirs(os.path.join(work, "config"), exist_ok=True)
+    with open(os.path.join(work, "config", "projects.json"), "w") as f:
+        json.dump({"libraries": libs}, f, indent=4)
+
+
+def time_process(cmd, cwd, env=None, ready=None, timeout=30):
+    # Wall time from spawn until exit, or until a line containing `ready` is printed
+    start = time.perf_counter()
+    proc = subprocess.Popen(cmd, cwd=cwd, env=env, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+    try:
+        if ready:
+            for line in proc.stdout:
+                if ready in line:
+                    elapsed = time.perf_counter() - start
+                    break
+            else:
+                raise RuntimeError(f"{' '.join(cmd)} exited before printing {ready!r}")
+        else:
+            proc.communicate(timeout=timeout)
+            elapsed = time.perf_counter() - start
+    finally:
+        if proc.poll() is None:
+            proc.kill()
+        proc.wait()
+    return elapsed
+
+
+def has_display():
+    return sys.platform in ("win32", "darwin") or bool(os.environ.get("DISPLAY") or os.environ.get("WAYLAND_DISPLAY"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure LocalLibSync start-up time with a large config.")
+    parser.add_argument("--libraries", type=int, default=300, help="libraries in the generated config")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--target", type=float, default=0.5, help="seconds the window must open within (median)")
+    parser.add_argument("--output", default="bench_startup.json")
+    parser.add_argument("--compare", help="previous results file to compare against")
+    args = parser.parse_args()
+
+    work = tempfile.mkdtemp(prefix="locallibsync-startup-")
+    output = os.path.abspath(args.output)
+    python = sys.executable
+    raw = {}
+    try:
+        make_config(work, args.libraries)
+        cases = {
+            "import_main": [python, "-c", f"import sys; sys.path.insert(0, {ROOT!r}); import main"],
+            "import_app_ui": [python, "-c", f"import sys; sys.path.insert(0, {ROOT!r}); import ui.app_ui"],
+            "cli_load_config": [python, MAIN, "snapshots", "lib0"],
+        }
+        for name, cmd in cases.items():
+            raw[name] = [time_process(cmd, work) for _ in range(args.repeat)]
+        if has_display():
+            env = dict(os.environ, LOCALLIBSYNC_STARTUP_PROBE="1")
+            raw["gui_first_paint"] = [
+                time_process([python, MAIN], work, env, ready="[STARTUP] first paint") for _ in range(args.repeat)
+            ]
+        else:
+            print("[WARN] No display available, skipping the GUI first-paint benchmark.")
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+
+    results = summarize(raw)
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "params": vars(args),
+        },
+        "results": results,
+    }
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    for name, r in results.items():
+        print(f"{name:48} median {r['median']:.4f}s")
+    print(f"[INFO] Results written to {output}")
+    if args.compare:
+        compare(results, args.compare)
+    # The window opening is what users wait for; without a display, the GUI import stands in for it
+    gated = "gui_first_paint" if "gui_first_paint" in results else "import_app_ui"
+    if results[gated]["median"] > args.target:
+        print(f"[FAIL] {gated} median {results[gated]['median']:.3f}s exceeds the {args.target:.3f}s target.")
+        sys.exit(1)
+    print(f"[OK] {gated} median {results[gated]['median']:.3f}s is within the {args.target:.3f}s target.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,223 @@
+import argparse
+import importlib.util
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from utils.file_utils import copy_folder, delete_if_exists
+from services.syncer import sync_output
+
+FAKE_BUILD = os.path.join(ROOT, "benchmarks", "fake_build.py")
+
+
+def make_output(root, files, large, large_mb):
+    for i in range(files):
+        path = os.path.join(root, "esm2020", f"chunk{i // 500}", f"file{i}.mjs")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(f"export const v{i} = {i};\n")
+    block = os.urandom(1024 * 1024)
+    for i in range(large):
+        path = os.path.join(root, "fesm2020", f"bundle{i}.mjs")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            for _ in range(large_mb):
+                f.write(block)
+
+
+def timed(fn, setup=None, repeat=3):
+    runs = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        fn()
+        runs.append(time.perf_counter() - start)
+    return runs
+
+
+def quiet(fn):
+    def run():
+        stdout = sys.stdout
+        sys.stdout = open(os.devnull, "w")
+        try:
+            fn()
+        finally:
+            sys.stdout.close()
+            sys.stdout = stdout
+    return run
+
+
+def bench_file_utils(work, src, repeat):
+    dest = os.path.join(work, "copy-target")
+    results = {}
+    results["copy_folder"] = timed(lambda: copy_folder(src, dest), lambda: delete_if_exists(dest), repeat)
+    delete_if_exists(dest)
+    results["delete_if_exists"] = timed(lambda: delete_if_exists(dest), lambda: copy_folder(src, dest), repeat)
+    return results
+
+
+def bench_sync(work, src, destinations, repeat):
+    results = {}
+    for mode in ("full", "delta", "staged"):
+        for publish in ("copy", "auto", "hardlink"):
+            config = {
+                "name": f"bench-{mode}-{publish}",
+                "build_output": src,
+                "destinations": [os.path.join(work, "apps", f"{mode}-{publish}-{i}", "node_modules", "lib") for i in range(destinations)],
+                "sync_mode": mode,
+                "publish_mode": publish,
+                # Background snapshots would compete for CPU with the timed runs and race reset()
+                "snapshots": 0,
+            }
+
+            def reset():
+                for dest in config["destinations"]:
+                    delete_if_exists(os.path.dirname(os.path.dirname(dest)))
+                delete_if_exists(os.path.join("config", ".cache"))
+
+            key = f"sync_output[{mode},{publish}]"
+            results[f"{key}.cold"] = timed(quiet(lambda: sync_output(config)), reset, repeat)
+            results[f"{key}.no_change"] = timed(quiet(lambda: sync_output(config)), None, repeat)
+            target = os.path.join(src, "esm2020", "chunk0", "file0.mjs")
+
+            def touch_one():
+                with open(target, "a") as f:
+                    f.write("//\n")
+            results[f"{key}.one_file"] = timed(quiet(lambda: sync_output(config)), touch_one, repeat)
+            reset()
+    return results
+
+
+def bench_watch_latency(work, files, repeat):
+    if importlib.util.find_spec("watchdog") is None:
+        print("[WARN] watchdog not installed, skipping watcher latency benchmark.")
+        return {}
+    from services.watcher import start_watcher, rebuild
+    from services.scheduler import DebouncedScheduler
+    lib = os.path.join(work, "watched-lib")
+    src_dir = os.path.join(lib, "src")
+    os.makedirs(src_dir, exist_ok=True)
+    with open(os.path.join(src_dir, "index.ts"), "w") as f:
+        f.write("0")
+    out = os.path.join(lib, "dist", "lib")
+    dest = os.path.join(work, "watched-app", "node_modules", "lib")
+    config = {
+        "name": "bench-watch",
+        "src": lib,
+        "build_output": out,
+        "build_command": f'"{sys.executable}" "{FAKE_BUILD}" src dist/lib {files}',
+        "destinations": [dest],
+        "debounce_seconds": 0.2,
+        "snapshots": 0,
+    }
+    stdout = sys.stdout
+    sys.stdout = open(os.devnull, "w")
+    scheduler = DebouncedScheduler(lambda _, paths, first: rebuild(config, paths, first), config["debounce_seconds"])
+    observer = start_watcher(config, scheduler)
+    runs = []
+    try:
+        for i in range(1, repeat + 1):
+            marker = f"run{i}-{time.time()}"
+            probe = os.path.join(dest, "esm2020", "chunk0", "file0.mjs")
+            start = time.perf_counter()
+            with open(os.path.join(src_dir, "index.ts"), "w") as f:
+                f.write(marker)
+            deadline = start + 60
+            while time.perf_counter() < deadline:
+                try:
+                    with open(probe) as f:
+                        if marker in f.read():
+                            break
+                except OSError:
+                    pass
+                time.sleep(0.01)
+            runs.append(time.perf_counter() - start)
+    finally:
+        observer.stop()
+        observer.join()
+        # Let an in-flight rebuild finish before the scratch tree is removed
+        scheduler.cancel_all()
+        while any(st["running"] for st in scheduler.state.values()):
+            time.sleep(0.05)
+        sys.stdout.close()
+        sys.stdout = stdout
+    return {"watch_event_to_sync": runs}
+
+
+def summarize(raw):
+    return {name: {"median": statistics.median(runs), "min": min(runs), "max": max(runs), "runs": runs} for name, runs in raw.items()}
+
+
+def compare(results, baseline_path):
+    with open(baseline_path) as f:
+        baseline = json.load(f)["results"]
+    print(f"\n{'benchmark':48} {'baseline':>10} {'current':>10} {'change':>8}")
+    for name, current in results.items():
+        if name not in baseline:
+            continue
+        before, after = baseline[name]["median"], current["median"]
+        change = (after - before) / before * 100 if before else 0
+        print(f"{name:48} {before:10.4f} {after:10.4f} {change:+7.1f}%")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark LocalLibSync build/sync paths on synthetic trees.")
+    parser.add_argument("--files", type=int, default=10000, help="number of small output files")
+    parser.add_argument("--large", type=int, default=3, help="number of large bundles")
+    parser.add_argument("--large-mb", type=int, default=8, help="size of each large bundle in MB")
+    parser.add_argument("--destinations", type=int, default=4)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--watch-files", type=int, default=500, help="files written by the fake build in the watcher benchmark")
+    parser.add_argument("--output", default="bench_results.json")
+    parser.add_argument("--compare", help="previous results file to compare against")
+    parser.add_argument("--skip-watch", action="store_true")
+    args = parser.parse_args()
+
+    work = tempfile.mkdtemp(prefix="locallibsync-bench-")
+    output = os.path.abspath(args.output)
+    cwd = os.getcwd()
+    # The sync engine keeps its caches under ./config, so run inside the scratch dir
+    os.chdir(work)
+    try:
+        src = os.path.join(work, "lib", "dist", "lib")
+        make_output(src, args.files, args.large, args.large_mb)
+        raw = {}
+        raw.update(bench_file_utils(work, src, args.repeat))
+        raw.update(bench_sync(work, src, args.destinations, args.repeat))
+        if not args.skip_watch:
+            raw.update(bench_watch_latency(work, args.watch_files, args.repeat))
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(work, ignore_errors=True)
+
+    results = summarize(raw)
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "params": vars(args),
+        },
+        "results": results,
+    }
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    for name, r in results.items():
+        print(f"{name:48} median {r['median']:.4f}s")
+    print(f"[INFO] Results written to {output}")
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
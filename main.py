@@ -1,14 +1,25 @@
-import json
 import time
 import os
 import sys
+from services.config_store import ConfigStore, ConfigError
 
 def load_config(config_path='config/projects.json'):
-    with open(config_path, 'r') as f:
-        return json.load(f)
+    store = ConfigStore(config_path)
+    config = store.load()
+    for path, other, names in store.overlapping_destinations():
+        where = path if path == other else f"{path} and {other}"
+        print(f"[WARN] Overlapping destinations {where} used by: {', '.join(names)}")
+    return config
 
 def run_watchers():
     from services.watcher import start_watcher
+    from services.daemon_client import DaemonClient
+    client = DaemonClient()
+    if client.is_running():
+        # The daemon already owns the watchers; starting our own would build every change twice
+        print("[INFO] Daemon is already watching, following its log instead.")
+        run_client('logs', ['--new'])
+        return
     config = load_config()
     for lib in config.get('libraries', []):
         build_output = lib.get('build_output')
@@ -24,12 +35,140 @@ def run_watchers():
     except KeyboardInterrupt:
         print("\n[INFO] Stopped watching.")
 
+def run_build_all(args):
+    import argparse
+    from services.orchestrator import build_all
+    from services.metrics import STATUS_OK
+    parser = argparse.ArgumentParser(prog="main.py build-all", description="Build every library in dependency order, then sync.")
+    parser.add_argument("--workers", type=int, help="libraries built in parallel")
+    parser.add_argument("--force", action="store_true", help="rebuild every library, even when its inputs and upstream outputs are unchanged")
+    options = parser.parse_args(args)
+    if options.workers is not None and options.workers < 1:
+        parser.error("--workers must be at least 1")
+    config = load_config()
+    try:
+        status = build_all(config.get('libraries', []), workers=options.workers, force=options.force)
+    except ValueError as e:
+        print(f"[ERROR] {e}")
+        sys.exit(1)
+    if any(state != STATUS_OK for state in status.values()):
+        sys.exit(1)
+
+def run_daemon():
+    from services.daemon import SyncDaemon
+    try:
+        SyncDaemon(load_config).serve_forever()
+    except KeyboardInterrupt:
+        print("\n[INFO] Daemon stopped.")
+    except OSError as e:
+        print(f"[ERROR] Could not start daemon: {e}")
+        sys.exit(1)
+
+def run_client(command, args):
+    from services.daemon_client import DaemonClient
+    client = DaemonClient()
+    if not client.is_running():
+        print("[ERROR] Daemon is not running. Start it with: python main.py daemon")
+        sys.exit(1)
+    if command == 'sync':
+        print(f"[INFO] Queued: {client.sync(args[0] if args else None)['queued']}")
+    elif command == 'status':
+        for name, st in client.status().items():
+            watch = st.get('watch')
+            if watch:
+                print(f"{name}: {st['state']} ({watch['backend']}, {watch['watches']} watch(es), ~{watch['memory_bytes'] / 1024:.0f} KB)")
+            else:
+                print(f"{name}: {st['state']}")
+    elif command == 'logs':
+        try:
+            for line in client.follow_logs(since=client.logs()['seq'] if '--new' in args else 0):
+                print(line)
+        except KeyboardInterrupt:
+            pass
+
+def run_snapshots(command, args):
+    from services.snapshots import list_snapshots, restore_snapshot
+    import datetime
+    if not args:
+        print(f"Usage: python main.py {command} <library> [snapshot-id]")
+        sys.exit(1)
+    libraries = {lib['name']: lib for lib in load_config().get('libraries', [])}
+    if args[0] not in libraries:
+        print(f"[ERROR] Unknown library: {args[0]}")
+        sys.exit(1)
+    lib = libraries[args[0]]
+    if command == 'snapshots':
+        for snap in list_snapshots(lib['name']):
+            created = datetime.datetime.fromtimestamp(snap['created']).strftime('%Y-%m-%d %H:%M:%S')
+            print(f"{snap['id']}  {created}  {len(snap['files'])} file(s)  {snap['bytes']} byte(s)")
+        return
+    try:
+        restore_snapshot(lib, args[1] if len(args) > 1 else None)
+    except (ValueError, OSError) as e:
+        print(f"[ERROR] Rollback failed: {e}")
+        sys.exit(1)
+
+def run_verify(args):
+    from services.verifier import verify_library, repair_library, drifted
+    libraries = load_config().get('libraries', [])
+    names = [a for a in args if not a.startswith('--')]
+    unknown = [n for n in names if n not in {lib['name'] for lib in libraries}]
+    if unknown:
+        print(f"[ERROR] Unknown library: {', '.join(unknown)}")
+        sys.exit(1)
+    remaining = 0
+    for lib in libraries:
+        if names and lib['name'] not in names:
+            continue
+        reports = verify_library(lib)
+        for dest, r in reports.items():
+            if r['error']:
+                print(f"[VERIFY] {lib['name']} -> {dest}: {r['error']}")
+                continue
+            state = "drifted" if drifted(r) else "in sync"
+            print(f"[VERIFY] {lib['name']} -> {dest}: {state} ({len(r['missing'])} missing, {len(r['modified'])} modified, "
+                  f"{len(r['extra'])} extra; {r['hashed']} of {r['checked']} file(s) hashed)")
+            for kind in ('missing', 'modified', 'extra'):
+                for rel in r[kind][:20]:
+                    print(f"    {kind}: {rel}")
+                if len(r[kind]) > 20:
+                    print(f"    ... {len(r[kind]) - 20} more {kind}")
+        if not any(drifted(r) for r in reports.values()):
+            continue
+        repair = '--repair' in args
+        if not repair and sys.stdin.isatty():
+            repair = input(f"Repair drifted destinations of {lib['name']}? [y/N] ").strip().lower() == 'y'
+        if repair:
+            results = repair_library(lib, reports)
+            remaining += sum(1 for r in reports.values() if r['error']) + sum(1 for r in results.values() if not r['ok'])
+        else:
+            remaining += sum(1 for r in reports.values() if drifted(r))
+    if remaining:
+        sys.exit(1)
+
 def run_gui():
     from ui.app_ui import launch_app
     launch_app()
 
-if __name__ == '__main__':
+def main():
     if len(sys.argv) > 1 and sys.argv[1] == 'watch':
         run_watchers()
+    elif len(sys.argv) > 1 and sys.argv[1] == 'build-all':
+        run_build_all(sys.argv[2:])
+    elif len(sys.argv) > 1 and sys.argv[1] == 'daemon':
+        run_daemon()
+    elif len(sys.argv) > 1 and sys.argv[1] == 'verify':
+        run_verify(sys.argv[2:])
+    elif len(sys.argv) > 1 and sys.argv[1] in ('snapshots', 'rollback'):
+        run_snapshots(sys.argv[1], sys.argv[2:])
+    elif len(sys.argv) > 1 and sys.argv[1] in ('sync', 'status', 'logs'):
+        run_client(sys.argv[1], sys.argv[2:])
     else:
-        run_gui()
\ No newline at end of file
+        run_gui()
+
+if __name__ == '__main__':
+    try:
+        main()
+    except ConfigError as e:
+        print(f"[ERROR] {e}")
+        sys.exit(1)
\ No newline at end of file
@@ -0,0 +1,34 @@
+import hashlib
+import os
+from services.manifest import read_cache, write_cache, update_tree_manifest
+from utils.path_filter import path_filter_for
+
+
+def compute_fingerprint(config, previous_files=None):
+    files, hashed = update_tree_manifest(previous_files or {}, config['src'], path_filter_for(config))
+    h = hashlib.blake2b(digest_size=16)
+    h.update(config['build_command'].encode())
+    for rel in sorted(files):
+        h.update(f"\0{rel}\0{files[rel][2]}".encode())
+    return h.hexdigest(), files, hashed
+
+
+def output_present(config):
+    path = config.get('build_output')
+    if not path or not os.path.isdir(path):
+        return False
+    with os.scandir(path) as it:
+        return any(True for _ in it)
+
+
+def check_build_cache(config):
+    # Returns (up_to_date, fingerprint, files); files are kept so a successful build can record them
+    cached = read_cache(config['name'], "fingerprints") or {}
+    fingerprint, files, hashed = compute_fingerprint(config, cached.get("files"))
+    up_to_date = cached.get("fingerprint") == fingerprint and output_present(config)
+    print(f"[BUILD] Source fingerprint {fingerprint[:12]} ({hashed} of {len(files)} file(s) re-hashed).")
+    return up_to_date, fingerprint, files
+
+
+def record_build(config, fingerprint, files):
+    write_cache(config['name'], "fingerprints", {"fingerprint": fingerprint, "files": files})
@@ -1,21 +1,124 @@
+import os
+import signal
 import subprocess
+import threading
+import time
+from collections import deque
+from services.build_cache import check_build_cache, record_build
 
-def build_library(config):
-    print(f"[BUILD] Building {config['name']} in {config['src']}...")
+MAX_OUTPUT_LINES = 2000
+MAX_LINE_LENGTH = 4000
+
+
+def kill_process_group(proc):
+    if proc.poll() is not None:
+        return
     try:
-        result = subprocess.run(
-            config['build_command'],
+        if os.name == 'posix':
+            os.killpg(proc.pid, signal.SIGTERM)
+            try:
+                proc.wait(timeout=3)
+            except subprocess.TimeoutExpired:
+                os.killpg(proc.pid, signal.SIGKILL)
+        else:
+            proc.kill()
+    except (ProcessLookupError, PermissionError):
+        pass
+
+
+class BuildProcess:
+    # Runs build_command and yields its output line by line as it is produced
+    def __init__(self, config, timeout=None, cancel_event=None):
+        self.config = config
+        self.timeout = timeout
+        self.cancel_event = cancel_event or threading.Event()
+        self.proc = None
+        self.returncode = None
+        self.timed_out = False
+        self.cancelled = False
+
+    def _spawn(self):
+        kwargs = {}
+        if os.name == 'posix':
+            kwargs['start_new_session'] = True
+        else:
+            kwargs['creationflags'] = subprocess.CREATE_NEW_PROCESS_GROUP
+        return subprocess.Popen(
+            self.config['build_command'],
             shell=True,
-            check=True,
-            cwd=config['src'],
+            cwd=self.config['src'],
             stdout=subprocess.PIPE,
             stderr=subprocess.STDOUT,
-            text=True
+            stdin=subprocess.DEVNULL,
+            text=True,
+            errors='replace',
+            bufsize=1,
+            **kwargs
         )
-        print(result.stdout)
-        print("[BUILD] Build successful.")
-        return True, result.stdout
-    except subprocess.CalledProcessError as e:
+
+    def _monitor(self):
+        deadline = time.monotonic() + self.timeout if self.timeout else None
+        while self.proc.poll() is None:
+            if self.cancel_event.wait(0.2):
+                self.cancelled = True
+                kill_process_group(self.proc)
+                return
+            if deadline and time.monotonic() > deadline:
+                self.timed_out = True
+                kill_process_group(self.proc)
+                return
+
+    def cancel(self):
+        self.cancel_event.set()
+
+    def __iter__(self):
+        self.proc = self._spawn()
+        monitor = threading.Thread(target=self._monitor, daemon=True)
+        monitor.start()
+        try:
+            for line in self.proc.stdout:
+                yield line.rstrip('\n')[:MAX_LINE_LENGTH]
+        finally:
+            self.proc.stdout.close()
+            self.returncode = self.proc.wait()
+            monitor.join(timeout=1)
+
+
+def build_library(config, on_line=print, timeout=None, cancel_event=None, force=False):
+    fingerprint = None
+    if config.get('build_cache', True):
+        try:
+            up_to_date, fingerprint, files = check_build_cache(config)
+        except OSError as e:
+            print(f"[WARN] Could not fingerprint {config['src']}: {e}")
+        else:
+            if up_to_date and not force:
+                message = f"[BUILD] {config['name']} is up to date, skipping build."
+                print(message)
+                return True, message
+    print(f"[BUILD] Building {config['name']} in {config['src']}...")
+    timeout = timeout or config.get('build_timeout')
+    tail = deque(maxlen=config.get('max_output_lines', MAX_OUTPUT_LINES))
+    runner = BuildProcess(config, timeout=timeout, cancel_event=cancel_event)
+    try:
+        for line in runner:
+            tail.append(line)
+            if on_line:
+                on_line(line)
+    except OSError as e:
         print(f"[ERROR] Build failed: {e}")
-        print(e.output if hasattr(e, 'output') else "")
-        return False, e.output if hasattr(e, 'output') else str(e)
\ No newline at end of file
+        return False, str(e)
+    output = "\n".join(tail)
+    if runner.cancelled:
+        print("[BUILD] Build cancelled.")
+        return False, output
+    if runner.timed_out:
+        print(f"[ERROR] Build timed out after {timeout}s.")
+        return False, output
+    if runner.returncode != 0:
+        print(f"[ERROR] Build failed: exit status {runner.returncode}")
+        return False, output
+    print("[BUILD] Build successful.")
+    if fingerprint:
+        record_build(config, fingerprint, files)
+    return True, output
@@ -0,0 +1,253 @@
+import copy
+import json
+import os
+import re
+import threading
+
+CONFIG_PATH = "config/projects.json"
+
+REQUIRED_STRINGS = ("name", "src", "build_output", "build_command")
+OPTIONAL_STRINGS = ("watch_command", "build_done_pattern", "build_fail_pattern")
+CHOICES = {
+    "sync_mode": ("delta", "full", "staged"),
+    "publish_mode": ("auto", "copy", "hardlink", "reflink", "symlink"),
+    "watcher": ("native", "polling"),
+    "build_mode": ("cold", "warm"),
+}
+BOOLS = ("verify_hash", "use_manifest", "build_cache", "use_default_excludes")
+NUMBERS = ("debounce_seconds", "build_timeout", "snapshot_store_mb", "poll_interval", "settle_seconds")
+# Used as counts and sizes (deque maxlen, list slices, pool sizes), so fractions are rejected
+INTEGERS = ("sync_workers", "snapshots", "max_output_lines")
+STRING_LISTS = ("destinations", "include", "exclude", "depends_on")
+
+
+class ConfigError(ValueError):
+    def __init__(self, errors):
+        self.errors = errors
+        super().__init__("Invalid config:\n  " + "\n  ".join(errors))
+
+
+def validate_library(lib, where="library"):
+    errors = []
+    if not isinstance(lib, dict):
+        return [f"{where}: expected an object"]
+    where = f"library '{lib.get('name', '?')}'" if isinstance(lib.get('name'), str) else where
+    for key in REQUIRED_STRINGS:
+        if not isinstance(lib.get(key), str) or not lib.get(key).strip():
+            errors.append(f"{where}: '{key}' is required and must be a non-empty string")
+    for key in OPTIONAL_STRINGS:
+        if key in lib and not isinstance(lib[key], str):
+            errors.append(f"{where}: '{key}' must be a string")
+    for key in ("build_done_pattern", "build_fail_pattern"):
+        if isinstance(lib.get(key), str):
+            try:
+                re.compile(lib[key])
+            except re.error as e:
+                errors.append(f"{where}: '{key}' is not a valid regular expression: {e}")
+    for key in STRING_LISTS:
+        if key in lib and (not isinstance(lib[key], list) or not all(isinstance(v, str) for v in lib[key])):
+            errors.append(f"{where}: '{key}' must be a list of strings")
+    if not lib.get("destinations"):
+        errors.append(f"{where}: at least one destination is required")
+    for key, allowed in CHOICES.items():
+        if key in lib and lib[key] not in allowed:
+            errors.append(f"{where}: '{key}' must be one of {', '.join(allowed)}")
+    for key in BOOLS:
+        if key in lib and not isinstance(lib[key], bool):
+            errors.append(f"{where}: '{key}' must be true or false")
+    for key in NUMBERS:
+        if key in lib and lib[key] is not None and (isinstance(lib[key], bool) or not isinstance(lib[key], (int, float)) or lib[key] < 0):
+            errors.append(f"{where}: '{key}' must be a non-negative number")
+    for key in INTEGERS:
+        if key in lib and lib[key] is not None and (isinstance(lib[key], bool) or not isinstance(lib[key], int) or lib[key] < 0):
+            errors.append(f"{where}: '{key}' must be a non-negative integer")
+    modes = lib.get("publish_modes", {})
+    if not isinstance(modes, dict) or any(m not in CHOICES["publish_mode"] for m in modes.values()):
+        errors.append(f"{where}: 'publish_modes' must map destinations to a publish mode")
+    return errors
+
+
+def validate(data):
+    if not isinstance(data, dict) or not isinstance(data.get("libraries", []), list):
+        raise ConfigError(["top level must be an object with a 'libraries' list"])
+    errors = []
+    names = set()
+    for i, lib in enumerate(data.get("libraries", [])):
+        errors.extend(validate_library(lib, f"library #{i + 1}"))
+        name = lib.get("name") if isinstance(lib, dict) else None
+        if name in names:
+            errors.append(f"library '{name}': duplicate name")
+        names.add(name)
+    for lib in data.get("libraries", []):
+        if isinstance(lib, dict):
+            for dep in lib.get("depends_on", []):
+                if dep not in names:
+                    errors.append(f"library '{lib.get('name')}': depends_on unknown library '{dep}'")
+    if not errors:
+        cyclic = _dependency_cycle(data.get("libraries", []))
+        if cyclic:
+            errors.append(f"depends_on cycle between: {', '.join(cyclic)}")
+    if errors:
+        raise ConfigError(errors)
+
+
+def _dependency_cycle(libraries):
+    # Peels off libraries with no unresolved dependency, then those nothing left depends on; what
+    # remains lies on a cycle
+    remaining = {lib["name"]: set(lib.get("depends_on", [])) for lib in libraries}
+    while True:
+        needed = set().union(*remaining.values())
+        done = [name for name, deps in remaining.items() if not deps or name not in needed]
+        if not done:
+            return sorted(remaining)
+        for name in done:
+            del remaining[name]
+        for deps in remaining.values():
+            deps.difference_update(done)
+
+
+def _norm(path):
+    return os.path.normcase(os.path.abspath(path))
+
+
+class ConfigStore:
+    # Validated, lazily loaded view of projects.json with indexes by library name and destination.
+    # Listeners get (event, name, library) with event in added/updated/removed.
+    def __init__(self, path=CONFIG_PATH):
+        self.path = path
+        self.lock = threading.RLock()
+        self.data = None
+        self.mtime = None
+        self.by_name = {}
+        self.by_destination = {}
+        self.listeners = []
+
+    def _read(self):
+        if not os.path.exists(self.path):
+            return {"libraries": []}, None
+        with open(self.path, "r") as f:
+            data = json.load(f)
+        return data, os.stat(self.path).st_mtime_ns
+
+    def _index(self):
+        self.by_name = {lib["name"]: lib for lib in self.data.get("libraries", [])}
+        self.by_destination = {}
+        for lib in self.data.get("libraries", []):
+            for dest in lib.get("destinations", []):
+                self.by_destination.setdefault(_norm(dest), []).append(lib["name"])
+
+    def load(self):
+        with self.lock:
+            if self.data is None:
+                data, mtime = self._read()
+                validate(data)
+                self.data, self.mtime = data, mtime
+                self._index()
+            return self.data
+
+    def libraries(self):
+        return list(self.load().get("libraries", []))
+
+    def get(self, name):
+        self.load()
+        return self.by_name.get(name)
+
+    def libraries_for_destination(self, path):
+        self.load()
+        return list(self.by_destination.get(_norm(path), []))
+
+    def overlapping_destinations(self):
+        # Same folder used twice, or one destination nested inside another
+        self.load()
+        overlaps = []
+        for path, names in sorted(self.by_destination.items()):
+            if len(names) > 1:
+                overlaps.append((path, path, names))
+            # Walk up to the filesystem root; sibling names like "lib" and "lib-extra" never match
+            child, parent = path, os.path.dirname(path)
+            while parent != child:
+                if parent in self.by_destination:
+                    overlaps.append((parent, path, sorted(set(self.by_destination[parent] + names))))
+                child, parent = parent, os.path.dirname(parent)
+        return overlaps
+
+    def subscribe(self, listener):
+        self.listeners.append(listener)
+
+    def _notify(self, events):
+        for event in events:
+            for listener in list(self.listeners):
+                try:
+                    listener(*event)
+                except Exception as e:
+                    print(f"[WARN] Config listener failed: {e}")
+
+    def _write(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp = self.path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(self.data, f, indent=4)
+        os.replace(tmp, self.path)
+        self.mtime = os.stat(self.path).st_mtime_ns
+
+    def upsert(self, library, old_name=None):
+        with self.lock:
+            self.load()
+            data = copy.deepcopy(self.data)
+            libs = data.setdefault("libraries", [])
+            key = old_name or library["name"]
+            position = next((i for i, lib in enumerate(libs) if lib["name"] == key), None)
+            if position is None:
+                libs.append(library)
+                events = [("added", library["name"], library)]
+            else:
+                # Keep keys the form does not know about (sync_mode, depends_on, ...)
+                merged = dict(libs[position], **library)
+                libs[position] = merged
+                library = merged
+                events = [("updated", library["name"], library)]
+                if key != library["name"]:
+                    events = [("removed", key, None), ("added", library["name"], library)]
+            validate(data)
+            self.data = data
+            self._index()
+            self._write()
+        self._notify(events)
+        return library
+
+    def remove(self, name):
+        with self.lock:
+            self.load()
+            libs = self.data.get("libraries", [])
+            data = dict(self.data, libraries=[lib for lib in libs if lib["name"] != name])
+            if len(data["libraries"]) == len(libs):
+                return False
+            validate(data)
+            self.data = data
+            self._index()
+            self._write()
+        self._notify([("removed", name, None)])
+        return True
+
+    def reload_if_changed(self):
+        # Cheap stat check; on change, re-validate and report only the libraries that differ
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except FileNotFoundError:
+            mtime = None
+        with self.lock:
+            if self.data is not None and mtime == self.mtime:
+                return []
+            old = dict(self.by_name)
+            data, mtime = self._read()
+            validate(data)
+            self.data, self.mtime = data, mtime
+            self._index()
+            events = [("removed", name, None) for name in old if name not in self.by_name]
+            for name, lib in self.by_name.items():
+                if name not in old:
+                    events.append(("added", name, lib))
+                elif old[name] != lib:
+                    events.append(("updated", name, lib))
+        self._notify(events)
+        return events
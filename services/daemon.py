@@ -0,0 +1,382 @@
+import hmac
+import json
+import os
+import secrets
+import sys
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs, unquote
+from services.builder import build_library
+from services.config_store import ConfigError, CONFIG_PATH
+from services.manifest import CACHE_DIR
+from services.syncer import sync_output, snapshot_output
+from services.scheduler import DebouncedScheduler
+from services.jobs import JobQueue, PRIORITY_HIGH, PRIORITY_NORMAL, PRIORITY_LOW
+from services.metrics import (
+    SyncRun, render_prometheus, read_history, sync_status, STATUS_OK, STATUS_BUILD_FAILED, STATUS_CANCELLED
+)
+
+HOST = "127.0.0.1"
+DEFAULT_PORT = int(os.environ.get("LOCALLIBSYNC_PORT", "8765"))
+CONFIG_POLL_INTERVAL = 1.0
+DEFAULT_DEBOUNCE_SECONDS = 0.5
+# Finished jobs are kept this long for GET /jobs/<id>, so a client polling its own sync can read the outcome
+MAX_TRACKED_JOBS = 500
+# Per-session secret the client must echo back; only readable by the user running the daemon
+TOKEN_PATH = os.path.join(CACHE_DIR, "daemon.token")
+TOKEN_HEADER = "X-LocalLibSync-Token"
+
+
+def read_token():
+    try:
+        with open(TOKEN_PATH) as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def write_token(token):
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    tmp = f"{TOKEN_PATH}.{os.getpid()}.tmp"
+    fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "w") as f:
+        f.write(token)
+    os.replace(tmp, TOKEN_PATH)
+
+
+def remove_token(token):
+    if read_token() == token:
+        try:
+            os.remove(TOKEN_PATH)
+        except OSError:
+            pass
+
+
+class LogBuffer:
+    # Tee for sys.stdout that keeps the most recent lines with sequence numbers for /logs
+    def __init__(self, stream, maxlen=5000):
+        self.stream = stream
+        self.lines = deque(maxlen=maxlen)
+        self.seq = 0
+        self.partial = ""
+        self.cond = threading.Condition()
+
+    def write(self, text):
+        self.stream.write(text)
+        with self.cond:
+            self.partial += text
+            *complete, self.partial = self.partial.split("\n")
+            for line in complete:
+                self.seq += 1
+                self.lines.append((self.seq, line))
+            if complete:
+                self.cond.notify_all()
+        return len(text)
+
+    def flush(self):
+        self.stream.flush()
+
+    def since(self, seq, timeout=0):
+        with self.cond:
+            if timeout and self.seq <= seq:
+                self.cond.wait(timeout)
+            return self.seq, [line for n, line in self.lines if n > seq]
+
+
+class SyncDaemon:
+    def __init__(self, load_config, port=DEFAULT_PORT, workers=None, config_path=CONFIG_PATH):
+        self.load_config = load_config
+        self.config_path = config_path
+        self.config_mtime = None
+        self.stopping = threading.Event()
+        self.port = port
+        self.libraries = {}
+        self.status = {}
+        self.verify_results = {}
+        self.tracked_jobs = {}
+        self.lock = threading.Lock()
+        self.reload_lock = threading.Lock()
+        self.observers = {}
+        self.logs = None
+        self.server = None
+        self.token = secrets.token_urlsafe(32)
+        self.jobs = JobQueue(workers or max(1, (os.cpu_count() or 2) // 2))
+        # Watch events are debounced first, then queued like any other sync request
+        self.scheduler = DebouncedScheduler(
+            lambda name, _, first_event: self.enqueue(name, first_event=first_event), self.quiet_window
+        )
+
+    def quiet_window(self, name):
+        # Each library keeps its own debounce_seconds, as it would under `python main.py watch`
+        window = self.libraries.get(name, {}).get('debounce_seconds')
+        return DEFAULT_DEBOUNCE_SECONDS if window is None else window
+
+    def reload(self):
+        # Only libraries whose entry changed get their watcher restarted; a broken file keeps the old config
+        with self.reload_lock:
+            self._reload()
+
+    def _reload(self):
+        from services.watcher import start_watcher
+        self.config_mtime = self._config_mtime()
+        try:
+            config = self.load_config()
+        except ConfigError as e:
+            print(f"[ERROR] Keeping previous config: {e}")
+            raise
+        libraries = {lib['name']: lib for lib in config.get('libraries', [])}
+        with self.lock:
+            previous, self.libraries = self.libraries, libraries
+            for name in libraries:
+                self.status.setdefault(name, {"state": "idle", "result": None, "updated": None})
+            for name in set(self.status) - set(libraries):
+                del self.status[name]
+                self.verify_results.pop(name, None)
+        for name in list(self.observers):
+            if libraries.get(name) != previous.get(name):
+                self.observers.pop(name).stop()
+        for name, lib in libraries.items():
+            if name in self.observers:
+                continue
+            if os.path.isdir(lib['src']):
+                self.observers[name] = start_watcher(lib, self.scheduler)
+            else:
+                print(f"[WARN] Source folder does not exist for {lib['name']}: {lib['src']}")
+        print(f"[DAEMON] Watching {len(self.observers)} of {len(libraries)} librar{'y' if len(libraries) == 1 else 'ies'}.")
+
+    def _config_mtime(self):
+        try:
+            return os.stat(self.config_path).st_mtime_ns
+        except OSError:
+            return None
+
+    def _watch_config(self):
+        # Picks up saves from the GUI or an editor without anyone having to call /reload
+        while not self.stopping.wait(CONFIG_POLL_INTERVAL):
+            if self._config_mtime() == self.config_mtime:
+                continue
+            try:
+                self.reload()
+            except ConfigError:
+                pass
+            except Exception as e:
+                print(f"[ERROR] Config reload failed: {e}")
+
+    def _set(self, name, state, result=None):
+        with self.lock:
+            self.status[name] = {"state": state, "result": result, "updated": time.time()}
+
+    def _run(self, name, cancel_event, trigger, first_event, queued):
+        config = self.libraries.get(name)
+        if config is None:
+            return
+        run = SyncRun(name, trigger, first_event, queued)
+        success = True
+        before = None
+        # Warm libraries are rebuilt by their long-lived watch process; only the sync runs here
+        if config.get('build_mode') != 'warm':
+            self._set(name, "building")
+            before = snapshot_output(config)
+            with run.span("build"):
+                success, _ = build_library(config, cancel_event=cancel_event)
+        if not success:
+            state = STATUS_CANCELLED if cancel_event.is_set() else STATUS_BUILD_FAILED
+            run.finish(state)
+            self._set(name, state, "build failed")
+            return state
+        self._set(name, "syncing")
+        with run.span("sync"):
+            results = sync_output(config, before=before)
+        run.add_sync_results(results)
+        state = sync_status(results)
+        if state == STATUS_OK:
+            with self.lock:
+                self.verify_results.pop(name, None)
+        run.finish(state)
+        self._set(name, state, results)
+        return state
+
+    def enqueue(self, name, priority=PRIORITY_NORMAL, first_event=None, trigger="watch"):
+        if name not in self.libraries:
+            return None
+        with self.lock:
+            if self.status[name]["state"] not in ("building", "syncing"):
+                self.status[name]["state"] = "queued"
+        queued = time.time()
+        job = self.jobs.submit(name, lambda cancel_event: self._run(name, cancel_event, trigger, first_event, queued), priority)
+        return self._track(job)
+
+    def trigger(self, name):
+        # Returns the job that will serve this request: a waiting one for the library, or a new one
+        return self.enqueue(name, PRIORITY_HIGH, first_event=time.time(), trigger="manual")
+
+    def _track(self, job):
+        with self.lock:
+            self.tracked_jobs[job.id] = job
+            while len(self.tracked_jobs) > MAX_TRACKED_JOBS:
+                del self.tracked_jobs[next(iter(self.tracked_jobs))]
+        return job
+
+    def job_status(self, job_id):
+        with self.lock:
+            job = self.tracked_jobs.get(job_id)
+        if job is None:
+            return None
+        # result is the run status (ok, build_failed, ...) once a sync job is done
+        return {"id": job.id, "library": job.key, "label": job.label, "state": job.state, "result": job.result, "error": job.error}
+
+    def _verify(self, name, repair):
+        from services.verifier import verify_library, repair_library
+        config = self.libraries.get(name)
+        if config is None:
+            return
+        try:
+            if repair:
+                # Never the stored reports: a sync since then may have added files they call extra
+                reports = verify_library(config)
+                for dest, result in repair_library(config, reports).items():
+                    if not result["ok"]:
+                        print(f"[ERROR] Could not repair {dest}: {result['error']}")
+            result = {"reports": verify_library(config), "error": None}
+        except Exception as e:
+            print(f"[ERROR] Verify {name}: {e}")
+            result = {"reports": {}, "error": str(e)}
+        with self.lock:
+            self.verify_results[name] = dict(result, updated=time.time())
+
+    def verify(self, name, repair=False):
+        # Shares the library's job key, so a check never reads a destination while a sync writes it
+        if name not in self.libraries:
+            return None
+        label = f"{'repair' if repair else 'verify'} {name}"
+        return self._track(self.jobs.submit(name, lambda cancel_event: self._verify(name, repair), PRIORITY_LOW, label=label))
+
+    def snapshot(self):
+        with self.lock:
+            status = {name: dict(st) for name, st in self.status.items()}
+        for name, observer in list(self.observers.items()):
+            if name in status and getattr(observer, 'stats', None):
+                status[name]["watch"] = dict(observer.stats)
+        with self.lock:
+            for name, result in self.verify_results.items():
+                if name in status:
+                    status[name]["verify"] = result
+        return status
+
+    def serve_forever(self):
+        self.server = ThreadingHTTPServer((HOST, self.port), make_handler(self))
+        self.server.daemon_threads = True
+        self.port = self.server.server_address[1]
+        write_token(self.token)
+        self.logs = LogBuffer(sys.stdout)
+        sys.stdout = self.logs
+        try:
+            self.reload()
+            threading.Thread(target=self._watch_config, name="config-watch", daemon=True).start()
+            print(f"[DAEMON] Listening on http://{HOST}:{self.port}")
+            self.server.serve_forever()
+        finally:
+            self.stopping.set()
+            for observer in self.observers.values():
+                observer.stop()
+            self.scheduler.cancel_all()
+            self.jobs.shutdown()
+            remove_token(self.token)
+            sys.stdout = self.logs.stream
+
+    def shutdown(self):
+        threading.Thread(target=self.server.shutdown, daemon=True).start()
+
+
+def make_handler(daemon):
+    class Handler(BaseHTTPRequestHandler):
+        def _reply(self, code, payload, content_type="application/json"):
+            body = payload.encode() if isinstance(payload, str) else json.dumps(payload).encode()
+            self.send_response(code)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _authorized(self):
+            # A browser page can reach 127.0.0.1 too; DNS rebinding shows up as a foreign Host and
+            # any other cross-site request lacks the token
+            host = self.headers.get("Host", "")
+            if host not in (f"{HOST}:{daemon.port}", f"localhost:{daemon.port}"):
+                self._reply(403, {"error": f"unexpected Host header: {host}"})
+                return False
+            token = self.headers.get(TOKEN_HEADER) or self.headers.get("Authorization", "").removeprefix("Bearer ")
+            if not hmac.compare_digest(token, daemon.token):
+                self._reply(403, {"error": "missing or invalid token"})
+                return False
+            return True
+
+        def do_GET(self):
+            if not self._authorized():
+                return
+            url = urlparse(self.path)
+            query = parse_qs(url.query)
+            try:
+                since = int(query.get("since", ["0"])[0])
+                wait = min(max(float(query.get("wait", ["0"])[0]), 0), 30)
+                limit = int(query.get("limit", ["200"])[0])
+                if limit < 1:
+                    raise ValueError(limit)
+            except ValueError:
+                self._reply(400, {"error": "since and wait must be numbers and limit a positive integer"})
+                return
+            if url.path == "/status":
+                self._reply(200, daemon.snapshot())
+            elif url.path == "/logs":
+                seq, lines = daemon.logs.since(since, wait)
+                self._reply(200, {"seq": seq, "lines": lines})
+            elif url.path == "/metrics":
+                self._reply(200, render_prometheus(), "text/plain; version=0.0.4")
+            elif url.path == "/history":
+                self._reply(200, read_history(limit))
+            elif url.path.startswith("/jobs/"):
+                job_id = url.path[len("/jobs/"):]
+                job = daemon.job_status(int(job_id)) if job_id.isdigit() else None
+                if job is None:
+                    self._reply(404, {"error": f"unknown job: {job_id}"})
+                else:
+                    self._reply(200, job)
+            else:
+                self._reply(404, {"error": "not found"})
+
+        def do_POST(self):
+            if not self._authorized():
+                return
+            url = urlparse(self.path)
+            parts = [unquote(p) for p in url.path.split("/") if p]
+            if len(parts) == 2 and parts[0] in ("sync", "verify", "repair"):
+                if parts[0] == "sync":
+                    job = daemon.trigger(parts[1])
+                else:
+                    job = daemon.verify(parts[1], repair=parts[0] == "repair")
+                if job:
+                    self._reply(202, {"queued": parts[1], "job": job.id})
+                else:
+                    self._reply(404, {"error": f"unknown library: {parts[1]}"})
+            elif parts == ["sync"]:
+                jobs = {name: daemon.trigger(name) for name in list(daemon.libraries)}
+                self._reply(202, {"queued": list(jobs), "jobs": {name: job.id for name, job in jobs.items() if job}})
+            elif parts == ["reload"]:
+                try:
+                    daemon.reload()
+                except ConfigError as e:
+                    self._reply(400, {"error": str(e), "errors": e.errors})
+                    return
+                self._reply(200, {"libraries": list(daemon.libraries)})
+            elif parts == ["shutdown"]:
+                self._reply(200, {"stopping": True})
+                daemon.shutdown()
+            else:
+                self._reply(404, {"error": "not found"})
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
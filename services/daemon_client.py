@@ -0,0 +1,52 @@
+import json
+from urllib.error import URLError
+from urllib.parse import quote
+from urllib.request import Request, urlopen
+from services.daemon import HOST, DEFAULT_PORT, TOKEN_HEADER, read_token
+
+
+class DaemonClient:
+    def __init__(self, port=DEFAULT_PORT):
+        self.base = f"http://{HOST}:{port}"
+
+    def _call(self, method, path, timeout=5):
+        req = Request(self.base + path, method=method, data=b"" if method == "POST" else None)
+        # Read on every call so a restarted daemon's new token is picked up
+        req.add_header(TOKEN_HEADER, read_token() or "")
+        with urlopen(req, timeout=timeout) as resp:
+            return json.loads(resp.read().decode())
+
+    def is_running(self):
+        try:
+            self._call("GET", "/status", timeout=0.5)
+            return True
+        except (URLError, OSError, ValueError):
+            return False
+
+    def status(self):
+        return self._call("GET", "/status")
+
+    def sync(self, name=None):
+        return self._call("POST", f"/sync/{quote(name, safe='')}" if name else "/sync")
+
+    def verify(self, name, repair=False):
+        return self._call("POST", f"/{'repair' if repair else 'verify'}/{quote(name, safe='')}")
+
+    def job(self, job_id):
+        return self._call("GET", f"/jobs/{job_id}")
+
+    def reload(self):
+        return self._call("POST", "/reload")
+
+    def shutdown(self):
+        return self._call("POST", "/shutdown")
+
+    def logs(self, since=0, wait=0):
+        return self._call("GET", f"/logs?since={since}&wait={wait}", timeout=wait + 5)
+
+    def follow_logs(self, since=0, wait=25):
+        while True:
+            data = self.logs(since, wait)
+            since = data["seq"]
+            for line in data["lines"]:
+                yield line
@@ -0,0 +1,136 @@
+import itertools
+import threading
+import time
+
+PRIORITY_LOW = 0
+PRIORITY_NORMAL = 5
+PRIORITY_HIGH = 10
+
+
+class Job:
+    _ids = itertools.count(1)
+
+    def __init__(self, key, fn, priority=PRIORITY_NORMAL, label=None):
+        self.id = next(Job._ids)
+        self.key = key
+        self.fn = fn
+        self.priority = priority
+        self.label = label or key
+        self.state = "queued"
+        self.error = None
+        self.result = None
+        self.cancel_event = threading.Event()
+        self.submitted = time.time()
+        self.started = None
+        self.finished = None
+        self.done = threading.Event()
+
+
+class JobQueue:
+    # Runs at most `workers` jobs at once and never two jobs with the same key at the same time.
+    # Submitting a key and label that are already waiting returns the waiting job instead of queueing another.
+    def __init__(self, workers=2, on_change=None):
+        self.workers = workers
+        self.on_change = on_change
+        self.cond = threading.Condition()
+        self.queued = []
+        self.running = {}
+        self.stopped = False
+        self.threads = []
+        for i in range(workers):
+            t = threading.Thread(target=self._work, name=f"job-worker-{i}", daemon=True)
+            t.start()
+            self.threads.append(t)
+
+    def _changed(self):
+        if self.on_change:
+            try:
+                self.on_change()
+            except Exception as e:
+                print(f"[WARN] Job queue listener failed: {e}")
+
+    def submit(self, key, fn, priority=PRIORITY_NORMAL, label=None):
+        with self.cond:
+            for job in self.queued:
+                # Only the same kind of job (key and label) is collapsed, so a queued verify never swallows a sync
+                if job.key == key and job.label == (label or key):
+                    job.priority = max(job.priority, priority)
+                    return job
+            job = Job(key, fn, priority, label)
+            self.queued.append(job)
+            self.cond.notify()
+        self._changed()
+        return job
+
+    def cancel(self, job_id):
+        with self.cond:
+            for job in self.queued:
+                if job.id == job_id:
+                    self.queued.remove(job)
+                    job.state = "cancelled"
+                    job.cancel_event.set()
+                    job.done.set()
+                    break
+            else:
+                for job in self.running.values():
+                    if job.id == job_id:
+                        job.cancel_event.set()
+                        break
+                else:
+                    return False
+        self._changed()
+        return True
+
+    def snapshot(self):
+        with self.cond:
+            running = list(self.running.values())
+            queued = sorted(self.queued, key=lambda j: (-j.priority, j.id))
+        return running + queued
+
+    def _next(self):
+        ready = [j for j in self.queued if j.key not in self.running]
+        if not ready:
+            return None
+        job = max(ready, key=lambda j: (j.priority, -j.id))
+        self.queued.remove(job)
+        return job
+
+    def _work(self):
+        while True:
+            with self.cond:
+                job = self._next()
+                while job is None and not self.stopped:
+                    self.cond.wait()
+                    job = self._next()
+                if job is None:
+                    return
+                job.state = "running"
+                job.started = time.time()
+                self.running[job.key] = job
+            self._changed()
+            try:
+                job.result = job.fn(job.cancel_event)
+                job.state = "cancelled" if job.cancel_event.is_set() else "done"
+            except Exception as e:
+                job.state = "failed"
+                job.error = str(e)
+                print(f"[ERROR] Job {job.label} failed: {e}")
+            finally:
+                job.finished = time.time()
+                with self.cond:
+                    del self.running[job.key]
+                    # A finished key may unblock a waiting job for the same library
+                    self.cond.notify_all()
+                job.done.set()
+                self._changed()
+
+    def shutdown(self):
+        with self.cond:
+            self.stopped = True
+            for job in self.queued:
+                job.state = "cancelled"
+                job.done.set()
+            self.queued = []
+            for job in self.running.values():
+                job.cancel_event.set()
+            self.cond.notify_all()
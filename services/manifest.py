@@ -0,0 +1,63 @@
+import json
+import os
+import re
+from utils.file_utils import scan_tree, file_hash
+
+CACHE_DIR = "config/.cache"
+
+
+def manifest_path(name, kind="manifests"):
+    safe = re.sub(r'[^A-Za-z0-9._-]', '_', name)
+    return os.path.join(CACHE_DIR, kind, f"{safe}.json")
+
+
+def read_cache(name, kind):
+    path = manifest_path(name, kind)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        print(f"[WARN] Ignoring unreadable cache file: {path}")
+        return None
+
+
+def write_cache(name, kind, data):
+    path = manifest_path(name, kind)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(data, f)
+    os.replace(tmp, path)
+
+
+def load_manifest(name):
+    data = read_cache(name, "manifests") or {}
+    data.setdefault("output", {})
+    data.setdefault("destinations", {})
+    return data
+
+
+def save_manifest(name, manifest):
+    write_cache(name, "manifests", manifest)
+
+
+def update_tree_manifest(previous, root, path_filter=None):
+    # Re-hash only files whose size or mtime moved since the last manifest
+    current = {}
+    hashed = 0
+    for rel, (size, mtime) in scan_tree(root, path_filter).items():
+        old = previous.get(rel)
+        if old and old[0] == size and old[1] == mtime:
+            current[rel] = old
+        else:
+            current[rel] = [size, mtime, file_hash(os.path.join(root, rel))]
+            hashed += 1
+    return current, hashed
+
+
+def diff_manifests(source, dest):
+    changed = [rel for rel, entry in source.items() if rel not in dest or dest[rel][2] != entry[2]]
+    stale = [rel for rel in dest if rel not in source]
+    return changed, stale
@@ -0,0 +1,130 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from services.manifest import CACHE_DIR
+
+METRICS_PATH = os.path.join(CACHE_DIR, "metrics.jsonl")
+MAX_METRICS_BYTES = 5 * 1024 * 1024
+
+# Outcome of a build+sync, shared by every caller, the metrics file and the daemon's /status
+STATUS_OK = "ok"
+STATUS_BUILD_FAILED = "build_failed"
+STATUS_SYNC_FAILED = "sync_failed"
+STATUS_CANCELLED = "cancelled"
+
+_lock = threading.Lock()
+_counters = {}
+
+
+def sync_status(results):
+    return STATUS_OK if results and all(r["ok"] for r in results.values()) else STATUS_SYNC_FAILED
+
+
+def _inc(name, labels, value=1.0):
+    key = (name, tuple(sorted(labels.items())))
+    with _lock:
+        _counters[key] = _counters.get(key, 0.0) + value
+
+
+class SyncRun:
+    # One build+sync of a library; spans are durations in seconds, written as a JSON line on finish().
+    # queued is when the run was handed to a job queue: debounce_wait ends there and queue_wait starts.
+    def __init__(self, library, trigger="manual", first_event=None, queued=None):
+        self.started = time.time()
+        self.first_event = first_event
+        self.record = {
+            "library": library,
+            "trigger": trigger,
+            "started": self.started,
+            "spans": {},
+            "destinations": {},
+            "status": None,
+        }
+        if first_event:
+            self.record["event_detected"] = first_event
+            self.record["spans"]["debounce_wait"] = max(0.0, (queued or self.started) - first_event)
+        if queued:
+            self.record["queued"] = queued
+            self.record["spans"]["queue_wait"] = max(0.0, self.started - queued)
+
+    @contextmanager
+    def span(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record["spans"][name] = self.record["spans"].get(name, 0.0) + time.perf_counter() - start
+
+    def add_sync_results(self, results):
+        for dest, r in results.items():
+            self.record["destinations"][dest] = {
+                "ok": r["ok"],
+                "strategy": r.get("strategy"),
+                "files": r.get("copied", 0),
+                "removed": r.get("removed", 0),
+                "bytes": r.get("bytes", 0),
+                "seconds": round(r.get("seconds", 0.0), 6),
+                "delete_seconds": round(r.get("delete_seconds", 0.0), 6),
+            }
+
+    def finish(self, status):
+        self.record["status"] = status
+        self.record["spans"]["total"] = time.time() - (self.first_event or self.started)
+        self.record["spans"] = {k: round(v, 6) for k, v in self.record["spans"].items()}
+        library = self.record["library"]
+        _inc("locallibsync_runs_total", {"library": library, "status": status})
+        for phase, seconds in self.record["spans"].items():
+            _inc("locallibsync_phase_seconds_sum", {"library": library, "phase": phase}, seconds)
+            _inc("locallibsync_phase_seconds_count", {"library": library, "phase": phase})
+        for dest, d in self.record["destinations"].items():
+            labels = {"library": library, "destination": dest}
+            _inc("locallibsync_destination_files_total", labels, d["files"])
+            _inc("locallibsync_destination_bytes_total", labels, d["bytes"])
+            _inc("locallibsync_destination_seconds_sum", labels, d["seconds"])
+        write_record(self.record)
+        return self.record
+
+
+def write_record(record, path=METRICS_PATH):
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with _lock:
+            if os.path.exists(path) and os.path.getsize(path) > MAX_METRICS_BYTES:
+                os.replace(path, path + ".1")
+            with open(path, "a") as f:
+                f.write(json.dumps(record) + "\n")
+    except OSError as e:
+        print(f"[WARN] Could not write metrics: {e}")
+
+
+def read_history(limit=200, path=METRICS_PATH):
+    if not os.path.exists(path):
+        return []
+    with open(path, "r") as f:
+        lines = f.readlines()[-limit:]
+    history = []
+    for line in lines:
+        try:
+            history.append(json.loads(line))
+        except ValueError:
+            continue
+    return history
+
+
+def render_prometheus():
+    def escape(value):
+        return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+    with _lock:
+        items = sorted(_counters.items())
+    out = []
+    seen = set()
+    for (name, labels), value in items:
+        if name not in seen:
+            seen.add(name)
+            out.append(f"# TYPE {name} counter")
+        label_text = ",".join(f'{k}="{escape(v)}"' for k, v in labels)
+        out.append(f"{name}{{{label_text}}} {value:g}")
+    return "\n".join(out) + "\n"
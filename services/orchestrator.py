@@ -0,0 +1,100 @@
+import os
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from services.builder import build_library
+from services.syncer import sync_output, snapshot_output
+from services.manifest import load_manifest, update_tree_manifest
+from services.metrics import SyncRun, sync_status, STATUS_OK, STATUS_BUILD_FAILED, STATUS_SYNC_FAILED
+
+
+def build_graph(libraries):
+    by_name = {lib['name']: lib for lib in libraries}
+    deps = {}
+    for lib in libraries:
+        missing = [d for d in lib.get('depends_on', []) if d not in by_name]
+        if missing:
+            raise ValueError(f"{lib['name']} depends on unknown librar{'y' if len(missing) == 1 else 'ies'}: {', '.join(missing)}")
+        deps[lib['name']] = set(lib.get('depends_on', []))
+    # Kahn's algorithm, only to reject cycles up front
+    remaining = {name: set(d) for name, d in deps.items()}
+    ready = [name for name, d in remaining.items() if not d]
+    seen = 0
+    while ready:
+        name = ready.pop()
+        seen += 1
+        for other, d in remaining.items():
+            if name in d:
+                d.discard(name)
+                if not d:
+                    ready.append(other)
+    if seen != len(deps):
+        cyclic = sorted(name for name, d in remaining.items() if d)
+        raise ValueError(f"Dependency cycle between: {', '.join(cyclic)}")
+    return by_name, deps
+
+
+def output_changed(config, before=None):
+    # Compared against the pre-build snapshot when there is one, else against the last synced manifest
+    previous = load_manifest(config['name'])['output']
+    current, _ = update_tree_manifest(previous, config['build_output'])
+    baseline = previous if before is None else before
+    return {rel: e[2] for rel, e in current.items()} != {rel: e[2] for rel, e in baseline.items()}
+
+
+def build_and_sync(config, force=False):
+    run = SyncRun(config['name'], "build-all")
+    before = snapshot_output(config)
+    with run.span("build"):
+        success, _ = build_library(config, force=force)
+    if not success:
+        run.finish(STATUS_BUILD_FAILED)
+        return STATUS_BUILD_FAILED, False
+    if before is None:
+        changed = output_changed(config)
+    with run.span("sync"):
+        results = sync_output(config, before=before)
+    if before is not None:
+        # sync_output has already refreshed the manifest, so this is stat-only
+        changed = output_changed(config, before)
+    run.add_sync_results(results)
+    state = sync_status(results)
+    run.finish(state)
+    return state, changed
+
+
+def build_all(libraries, workers=None, force=False):
+    by_name, deps = build_graph(libraries)
+    workers = workers or os.cpu_count() or 1
+    status = {}
+    changed = {}
+    pending = set(by_name)
+    running = {}
+
+    def run(name):
+        upstream = deps[name]
+        if any(status[d] != STATUS_OK for d in upstream):
+            print(f"[SKIP] {name}: an upstream library failed.")
+            return name, "skipped", False
+        rebuild = force or any(changed[d] for d in upstream)
+        if rebuild and not force:
+            print(f"[BUILD] {name}: upstream output changed, forcing rebuild.")
+        return (name,) + build_and_sync(by_name[name], force=rebuild)
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        while pending or running:
+            for name in sorted(pending):
+                if deps[name] <= status.keys():
+                    pending.discard(name)
+                    running[pool.submit(run, name)] = name
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                try:
+                    _, state, did_change = future.result()
+                except Exception as e:
+                    print(f"[ERROR] {name}: {e}")
+                    state, did_change = STATUS_SYNC_FAILED, False
+                status[name] = state
+                changed[name] = did_change
+    for name in by_name:
+        print(f"[DONE] {name}: {status[name]}")
+    return status
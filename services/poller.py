@@ -0,0 +1,120 @@
+import os
+import sys
+import threading
+import time
+
+DEFAULT_POLL_INTERVAL = 1.0
+# Directories modified this recently are listed again next round, in case the filesystem's
+# mtime granularity hid a file created right after we listed it
+RECENT_DIR_NS = 2 * 10**9
+
+
+def _deep_size(d):
+    total = sys.getsizeof(d)
+    for key, value in d.items():
+        total += sys.getsizeof(key) + sys.getsizeof(value)
+        if isinstance(value, tuple):
+            total += sum(sys.getsizeof(v) for v in value if isinstance(v, (set, frozenset)))
+    return total
+
+
+class PollingWatcher(threading.Thread):
+    # Stat-snapshot watcher for trees where inotify runs out of watches or misses events
+    # (network shares, bind mounts). A directory is only listed again when its mtime changed;
+    # otherwise just its known files are stat()ed. Calls on_change(path) for every difference.
+    def __init__(self, roots, path_filter, on_change, interval=DEFAULT_POLL_INTERVAL, name=None):
+        super().__init__(name=f"poll-{name}" if name else None, daemon=True)
+        self.roots = list(roots)
+        self.path_filter = path_filter
+        self.on_change = on_change
+        self.interval = interval
+        self.dirs = {}
+        self.files = {}
+        self.stopped = threading.Event()
+        self.ready = threading.Event()
+        self.stats = {"backend": "polling", "watches": 0, "files": 0, "memory_bytes": 0, "scan_seconds": 0.0}
+
+    def _list(self, path):
+        files, subdirs = set(), set()
+        with os.scandir(path) as it:
+            for entry in it:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        if not self.path_filter.excludes_dir(entry.path):
+                            subdirs.add(entry.name)
+                    elif self.path_filter.matches(entry.path):
+                        files.add(entry.name)
+                except OSError:
+                    continue
+        return frozenset(files), frozenset(subdirs)
+
+    def _forget_dir(self, path, changed):
+        _, files, subdirs = self.dirs.pop(path)
+        for name in files:
+            if self.files.pop(os.path.join(path, name), None) is not None:
+                changed.append(os.path.join(path, name))
+
+    def scan(self):
+        start = time.perf_counter()
+        now = time.time_ns()
+        changed = []
+        seen = set()
+        stack = list(self.roots)
+        while stack:
+            path = stack.pop()
+            try:
+                mtime = os.stat(path).st_mtime_ns
+            except OSError:
+                continue
+            seen.add(path)
+            known = self.dirs.get(path)
+            if known is None or known[0] is None or known[0] != mtime:
+                try:
+                    files, subdirs = self._list(path)
+                except OSError:
+                    continue
+                if known is not None:
+                    for name in known[1] - files:
+                        if self.files.pop(os.path.join(path, name), None) is not None:
+                            changed.append(os.path.join(path, name))
+                self.dirs[path] = (None if now - mtime < RECENT_DIR_NS else mtime, files, subdirs)
+            else:
+                files, subdirs = known[1], known[2]
+            for name in files:
+                file_path = os.path.join(path, name)
+                try:
+                    st = os.stat(file_path)
+                    sig = (st.st_size, st.st_mtime_ns)
+                except OSError:
+                    sig = None
+                old = self.files.get(file_path)
+                if sig != old:
+                    if sig is None:
+                        self.files.pop(file_path, None)
+                    else:
+                        self.files[file_path] = sig
+                    changed.append(file_path)
+            stack.extend(os.path.join(path, name) for name in subdirs)
+        for path in [p for p in self.dirs if p not in seen]:
+            self._forget_dir(path, changed)
+        self.stats["scan_seconds"] = round(time.perf_counter() - start, 6)
+        if changed or not self.ready.is_set():
+            self.stats["watches"] = len(self.dirs)
+            self.stats["files"] = len(self.files)
+            self.stats["memory_bytes"] = _deep_size(self.dirs) + _deep_size(self.files)
+        return changed
+
+    def run(self):
+        try:
+            self.scan()
+        finally:
+            self.ready.set()
+        while not self.stopped.wait(self.interval):
+            try:
+                for path in self.scan():
+                    self.on_change(path)
+            except Exception as e:
+                print(f"[WARN] Polling {', '.join(self.roots)} failed: {e}")
+
+    def stop(self):
+        self.stopped.set()
@@ -0,0 +1,66 @@
+import threading
+import time
+
+
+class DebouncedScheduler:
+    # Coalesces bursts of events per key into a single call of action(key, paths, first_event),
+    # never running the same key twice at once and queueing at most one follow-up run.
+    # quiet_window is seconds, or a callable(key) returning seconds when one scheduler serves many keys.
+    def __init__(self, action, quiet_window=0.5):
+        self.action = action
+        self.quiet_window = quiet_window
+        self.lock = threading.Lock()
+        self.state = {}
+
+    def _get(self, key):
+        return self.state.setdefault(key, {"timer": None, "running": False, "pending": False, "paths": set(), "first_event": None})
+
+    def notify(self, key, path=None):
+        with self.lock:
+            st = self._get(key)
+            if st["first_event"] is None:
+                st["first_event"] = time.time()
+            if path:
+                st["paths"].add(path)
+            if st["running"]:
+                st["pending"] = True
+                return
+            self._arm(key, st)
+
+    def _arm(self, key, st):
+        if st["timer"]:
+            st["timer"].cancel()
+        window = self.quiet_window(key) if callable(self.quiet_window) else self.quiet_window
+        timer = threading.Timer(window, self._fire, args=(key,))
+        timer.daemon = True
+        st["timer"] = timer
+        timer.start()
+
+    def _fire(self, key):
+        with self.lock:
+            st = self._get(key)
+            st["timer"] = None
+            if st["running"]:
+                st["pending"] = True
+                return
+            st["running"] = True
+            paths, st["paths"] = st["paths"], set()
+            first_event, st["first_event"] = st["first_event"], None
+        try:
+            self.action(key, paths, first_event)
+        except Exception as e:
+            print(f"[ERROR] Scheduled run for {key} failed: {e}")
+        finally:
+            with self.lock:
+                st["running"] = False
+                if st["pending"]:
+                    st["pending"] = False
+                    self._arm(key, st)
+
+    def cancel_all(self):
+        with self.lock:
+            for st in self.state.values():
+                if st["timer"]:
+                    st["timer"].cancel()
+                    st["timer"] = None
+                st["pending"] = False
@@ -0,0 +1,296 @@
+import hashlib
+import json
+import os
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from services.manifest import CACHE_DIR, load_manifest, save_manifest
+from utils.file_utils import (
+    delete_if_exists, ensure_folder, scan_tree, sibling_path, swap_into_place, publish_file, probe_strategy, remove_file,
+    publish_mode
+)
+
+STORE_DIR = os.path.join(CACHE_DIR, "snapshots")
+BLOB_DIR = os.path.join(STORE_DIR, "blobs")
+OBJECT_DIR = os.path.join(STORE_DIR, "objects")
+INDEX_PATH = os.path.join(STORE_DIR, "index.json")
+LOCK_PATH = os.path.join(STORE_DIR, "index.lock")
+DEFAULT_KEEP = 5
+DEFAULT_MAX_STORE_MB = 1024
+CHUNK = 1024 * 1024
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# Index updates and garbage collection are serialized: threads through _lock, processes (GUI,
+# daemon, CLI) through an flock on LOCK_PATH. Compression happens outside the lock.
+_lock = threading.RLock()
+# Snapshots are taken on this worker so compressing a new build never delays the sync itself;
+# its thread is joined at interpreter exit, so CLI runs still finish their snapshot
+_worker = ThreadPoolExecutor(max_workers=1, thread_name_prefix="snapshot")
+
+
+def _shard(root, digest):
+    return os.path.join(root, digest[:2], digest)
+
+
+def load_index():
+    if not os.path.exists(INDEX_PATH):
+        return {"snapshots": []}
+    try:
+        with open(INDEX_PATH, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        print(f"[WARN] Ignoring unreadable snapshot index: {INDEX_PATH}")
+        return {"snapshots": []}
+
+
+def _tmp_path(path):
+    return f"{path}.{os.getpid()}-{threading.get_ident()}.tmp"
+
+
+def save_index(index):
+    ensure_folder(STORE_DIR)
+    tmp = _tmp_path(INDEX_PATH)
+    with open(tmp, "w") as f:
+        json.dump(index, f)
+    os.replace(tmp, INDEX_PATH)
+
+
+@contextmanager
+def locked_index():
+    # Yields the current index under both locks and saves it on a clean exit
+    with _lock:
+        ensure_folder(STORE_DIR)
+        with open(LOCK_PATH, "a") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            try:
+                index = load_index()
+                if "store_bytes" not in index:
+                    index["store_bytes"] = live_size(index)
+                yield index
+                save_index(index)
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+
+def store_blob(path, digest):
+    # Returns False when the file no longer has the expected content (the output changed since
+    # the manifest was taken); the caller then skips this snapshot
+    blob = _shard(BLOB_DIR, digest)
+    if os.path.exists(blob):
+        return True
+    ensure_folder(os.path.dirname(blob))
+    tmp = _tmp_path(blob)
+    compressor = zlib.compressobj(6)
+    h = hashlib.blake2b(digest_size=16)
+    try:
+        with open(path, "rb") as src, open(tmp, "wb") as out:
+            for chunk in iter(lambda: src.read(CHUNK), b""):
+                h.update(chunk)
+                out.write(compressor.compress(chunk))
+            out.write(compressor.flush())
+        if h.hexdigest() != digest:
+            return False
+        os.replace(tmp, blob)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+    return True
+
+
+def materialize(digest):
+    # Decompressed copies are kept so later restores of the same content are pure hardlinks
+    obj = _shard(OBJECT_DIR, digest)
+    if os.path.exists(obj):
+        return obj
+    ensure_folder(os.path.dirname(obj))
+    tmp = _tmp_path(obj)
+    decompressor = zlib.decompressobj()
+    with open(_shard(BLOB_DIR, digest), "rb") as src, open(tmp, "wb") as out:
+        for chunk in iter(lambda: src.read(CHUNK), b""):
+            out.write(decompressor.decompress(chunk))
+        out.write(decompressor.flush())
+    os.replace(tmp, obj)
+    return obj
+
+
+def snapshot_id(files):
+    h = hashlib.blake2b(digest_size=6)
+    for rel in sorted(files):
+        h.update(f"{rel}\0{files[rel][2]}\0".encode())
+    return h.hexdigest()
+
+
+def live_digests(index):
+    return {digest for snap in index["snapshots"] for _, digest in snap["files"].values()}
+
+
+def live_size(index):
+    # Bytes held by referenced blobs and objects; files written by a snapshot still in progress don't count
+    total = 0
+    for digest in live_digests(index):
+        for root in (BLOB_DIR, OBJECT_DIR):
+            try:
+                total += os.path.getsize(_shard(root, digest))
+            except OSError:
+                pass
+    return total
+
+
+def take_snapshot(config, output_manifest):
+    keep = config.get('snapshots', DEFAULT_KEEP)
+    if not keep:
+        return None
+    files = {rel: [entry[0], entry[2]] for rel, entry in output_manifest.items()}
+    snap_id = snapshot_id(output_manifest)
+    digests = {digest: os.path.join(config['build_output'], rel) for rel, (_, digest) in files.items()}
+    # Compress outside the lock; a blob collected by a concurrent eviction before we index it is
+    # simply stored again below, while holding the lock
+    for digest, path in digests.items():
+        if not store_blob(path, digest):
+            print(f"[SNAPSHOT] Skipped {config['name']}@{snap_id}: the build output changed while snapshotting.")
+            return None
+    with locked_index() as index:
+        now = time.time()
+        for snap in index["snapshots"]:
+            if snap["library"] == config['name'] and snap["id"] == snap_id:
+                snap["created"] = snap["last_used"] = now
+                return snap_id
+        live = live_digests(index)
+        added = 0
+        for digest, path in digests.items():
+            blob = _shard(BLOB_DIR, digest)
+            if not os.path.exists(blob) and not store_blob(path, digest):
+                print(f"[SNAPSHOT] Skipped {config['name']}@{snap_id}: the build output changed while snapshotting.")
+                return None
+            if digest not in live:
+                added += os.path.getsize(blob)
+        index["store_bytes"] += added
+        index["snapshots"].append({
+            "id": snap_id,
+            "library": config['name'],
+            "created": now,
+            "last_used": now,
+            "bytes": sum(size for size, _ in files.values()),
+            "files": files,
+        })
+        evict(index, config['name'], keep, config.get('snapshot_store_mb', DEFAULT_MAX_STORE_MB))
+    print(f"[SNAPSHOT] Stored {config['name']}@{snap_id} ({len(files)} file(s), {added} new compressed byte(s)).")
+    return snap_id
+
+
+def _take_snapshot_quietly(config, output_manifest):
+    try:
+        return take_snapshot(config, output_manifest)
+    except OSError as e:
+        print(f"[WARN] Could not snapshot {config['name']}: {e}")
+
+
+def take_snapshot_async(config, output_manifest):
+    return _worker.submit(_take_snapshot_quietly, dict(config), dict(output_manifest))
+
+
+def store_size():
+    total = 0
+    for root in (BLOB_DIR, OBJECT_DIR):
+        for current, _, names in os.walk(root):
+            for name in names:
+                try:
+                    total += os.path.getsize(os.path.join(current, name))
+                except OSError:
+                    pass
+    return total
+
+
+def collect_garbage(index, dropped):
+    # Only called under locked_index(). Removes the blobs and objects of dropped snapshots that no
+    # remaining snapshot references, and keeps index["store_bytes"] in step without walking the store
+    live = live_digests(index)
+    for digest in {d for snap in dropped for _, d in snap["files"].values()} - live:
+        for root in (BLOB_DIR, OBJECT_DIR):
+            path = _shard(root, digest)
+            try:
+                size = os.path.getsize(path)
+            except OSError:
+                continue
+            remove_file(path)
+            index["store_bytes"] = max(0, index["store_bytes"] - size)
+
+
+def evict(index, library, keep, max_store_mb):
+    mine = sorted((s for s in index["snapshots"] if s["library"] == library), key=lambda s: s["created"])
+    dropped = mine[:-keep] if len(mine) > keep else []
+    index["snapshots"] = [s for s in index["snapshots"] if not any(s is d for d in dropped)]
+    collect_garbage(index, dropped)
+    limit = max_store_mb * 1024 * 1024
+    # Over budget: drop least recently used snapshots, but always keep each library's newest one
+    while index["store_bytes"] > limit:
+        newest = {}
+        for s in index["snapshots"]:
+            if s["created"] >= newest.get(s["library"], {"created": -1})["created"]:
+                newest[s["library"]] = s
+        candidates = [s for s in index["snapshots"] if newest[s["library"]] is not s]
+        if not candidates:
+            break
+        victim = min(candidates, key=lambda s: s["last_used"])
+        index["snapshots"].remove(victim)
+        collect_garbage(index, [victim])
+
+
+def list_snapshots(library):
+    return sorted((s for s in load_index()["snapshots"] if s["library"] == library), key=lambda s: s["created"], reverse=True)
+
+
+def restore_snapshot(config, snap_id=None, destinations=None):
+    # Held under the index lock so eviction cannot collect objects while they are being linked
+    with locked_index() as index:
+        snaps = sorted(
+            (s for s in index["snapshots"] if s["library"] == config['name']), key=lambda s: s["created"], reverse=True
+        )
+        if not snaps:
+            raise ValueError(f"No snapshots stored for {config['name']}")
+        if snap_id is None:
+            # Default to the snapshot before the current one, i.e. undo the last sync
+            snap = snaps[1] if len(snaps) > 1 else snaps[0]
+        else:
+            matches = [s for s in snaps if s["id"].startswith(snap_id)]
+            if len(matches) != 1:
+                raise ValueError(f"Snapshot '{snap_id}' not found (or ambiguous) for {config['name']}")
+            snap = matches[0]
+        objects = {}
+        for _, digest in snap["files"].values():
+            if digest not in objects:
+                existed = os.path.exists(_shard(OBJECT_DIR, digest))
+                objects[digest] = materialize(digest)
+                if not existed:
+                    index["store_bytes"] += os.path.getsize(objects[digest])
+        manifest = load_manifest(config['name'])
+        for dest in destinations or config['destinations']:
+            parent = os.path.dirname(os.path.normpath(dest))
+            ensure_folder(parent)
+            sample = next(iter(objects.values()), None)
+            strategy = probe_strategy(sample, parent, publish_mode(config, dest))
+            staging = sibling_path(dest, "restore")
+            delete_if_exists(staging)
+            try:
+                for rel, (_, digest) in snap["files"].items():
+                    publish_file(objects[digest], os.path.join(staging, rel), strategy)
+                ensure_folder(staging)
+                swap_into_place(staging, dest)
+            finally:
+                delete_if_exists(staging)
+            stats = scan_tree(dest)
+            manifest['destinations'][dest] = {
+                rel: [stats[rel][0], stats[rel][1], digest] for rel, (_, digest) in snap["files"].items() if rel in stats
+            }
+            print(f"[SNAPSHOT] Restored {dest} to {config['name']}@{snap['id']} via {strategy}.")
+        save_manifest(config['name'], manifest)
+        snap["last_used"] = time.time()
+    return snap["id"]
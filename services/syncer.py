@@ -1,8 +1,140 @@
-from utils.file_utils import delete_if_exists, copy_folder
+from utils.file_utils import (
+    delete_if_exists, copy_folder, scan_tree, file_hash, copy_file_multi, remove_file, prune_empty_dirs,
+    ensure_folder, sibling_path, swap_into_place, publish_file, probe_strategy, first_file,
+    publish_mode
+)
+from services.manifest import load_manifest, save_manifest, update_tree_manifest, diff_manifests
+from services.snapshots import take_snapshot_async, DEFAULT_KEEP
+from concurrent.futures import ThreadPoolExecutor
 import os
+import shutil
 import time
 
-def sync_output(config, retries=3, delay=0.5):
+
+def diff_trees(src_path, dest_path, src_entries, dest_entries, use_hash=False):
+    changed = []
+    for rel, (size, mtime) in src_entries.items():
+        current = dest_entries.get(rel)
+        if current is None:
+            changed.append(rel)
+            continue
+        if current == (size, mtime):
+            continue
+        if use_hash and current[0] == size:
+            src_file = os.path.join(src_path, rel)
+            dest_file = os.path.join(dest_path, rel)
+            if file_hash(src_file) == file_hash(dest_file):
+                # Same content, just align the timestamps so the next pass is stat-only
+                shutil.copystat(src_file, dest_file)
+                continue
+        changed.append(rel)
+    stale = [rel for rel in dest_entries if rel not in src_entries]
+    return changed, stale
+
+
+def plan_destination(src_path, dest, source_manifest=None, dest_manifest=None, use_hash=False):
+    if source_manifest is not None and dest_manifest is not None and os.path.isdir(dest):
+        return diff_manifests(source_manifest, dest_manifest)
+    return diff_trees(src_path, dest, scan_tree(src_path), scan_tree(dest), use_hash)
+
+
+def resolve_strategy(config, dest, sample):
+    return probe_strategy(sample, os.path.dirname(os.path.normpath(dest)), publish_mode(config, dest))
+
+
+def sync_staged(src_path, dest, strategy='copy'):
+    # Build the new tree next to dest, then swap it in so consumers never see a half-written package
+    ensure_folder(os.path.dirname(os.path.normpath(dest)))
+    staging = sibling_path(dest, "staging")
+    delete_if_exists(staging)
+    try:
+        copy_folder(src_path, staging, strategy)
+        swap_into_place(staging, dest)
+    finally:
+        delete_if_exists(staging)
+
+
+def fan_out(src_path, plans, strategies, pool, on_progress=None):
+    # Group destinations by file so each changed source file is read once for all of them
+    targets = {}
+    for dest, (changed, _) in plans.items():
+        for rel in changed:
+            targets.setdefault(rel, []).append(dest)
+
+    def copy_one(rel):
+        src_file = os.path.join(src_path, rel)
+        copies = [d for d in targets[rel] if strategies[d] == 'copy']
+        failures = {}
+        elapsed = {}
+        for dest in targets[rel]:
+            if strategies[dest] == 'copy':
+                continue
+            start = time.perf_counter()
+            try:
+                publish_file(src_file, os.path.join(dest, rel), strategies[dest])
+            except OSError as e:
+                failures[dest] = e
+            elapsed[dest] = time.perf_counter() - start
+        if not copies:
+            return failures, elapsed
+        start = time.perf_counter()
+        try:
+            errors = copy_file_multi(src_file, [os.path.join(d, rel) for d in copies])
+        except OSError as e:
+            errors = {os.path.join(d, rel): e for d in copies}
+        # Copies share one read, so each destination is charged the whole multi-write
+        shared = time.perf_counter() - start
+        for d in copies:
+            elapsed[d] = shared
+            if os.path.join(d, rel) in errors:
+                failures[d] = errors[os.path.join(d, rel)]
+        return failures, elapsed
+
+    failures = {}
+    timings = {}
+    total = sum(len(d) for d in targets.values())
+    done = 0
+    for rel, (errors, elapsed) in zip(targets, pool.map(copy_one, targets)):
+        for dest, error in errors.items():
+            failures.setdefault(dest, error)
+        for dest, seconds in elapsed.items():
+            timings[dest] = timings.get(dest, 0.0) + seconds
+        done += len(targets[rel])
+        if on_progress:
+            on_progress(done, total)
+    return failures, timings
+
+
+def remove_stale(dest, stale):
+    for rel in stale:
+        remove_file(os.path.join(dest, rel))
+    if stale:
+        prune_empty_dirs(dest)
+
+
+def snapshot_output(config):
+    # Output manifest as it stands before a build; only files whose stat moved are re-hashed
+    if config.get('sync_mode', 'delta') == 'full' or not config.get('use_manifest', True):
+        return None
+    if not os.path.isdir(config['build_output']):
+        return {}
+    manifest = load_manifest(config['name'])
+    manifest['output'], _ = update_tree_manifest(manifest['output'], config['build_output'])
+    save_manifest(config['name'], manifest)
+    return manifest['output']
+
+
+def format_bytes(count):
+    for unit in ("B", "KB", "MB"):
+        if count < 1024:
+            return f"{count:.0f} {unit}" if unit == "B" else f"{count:.1f} {unit}"
+        count /= 1024
+    return f"{count:.1f} GB"
+
+
+def sync_output(config, retries=3, delay=0.5, on_progress=None, before=None):
+    # before: output manifest from snapshot_output() taken ahead of the build. Destinations that were
+    # in sync with it only receive what the build changed, without diffing their whole tree.
     src_path = config['build_output']
     for attempt in range(retries):
         if os.path.exists(src_path):
@@ -11,9 +143,148 @@ def sync_output(config, retries=3, delay=0.5):
         time.sleep(delay)
     else:
         print(f"[ERROR] Build output folder does not exist after retries: {src_path}")
-        return
-    for dest in config['destinations']:
-        print(f"[SYNC] Syncing to {dest}")
-        delete_if_exists(dest)
-        copy_folder(src_path, dest)
-        print("[SYNC] Done.")
\ No newline at end of file
+        return {}
+    destinations = config['destinations']
+    mode = config.get('sync_mode', 'delta')
+    use_hash = config.get('verify_hash', False)
+    use_manifest = mode != 'full' and config.get('use_manifest', True)
+    workers = config.get('sync_workers') or min(8, (os.cpu_count() or 1) + 4)
+    results = {
+        dest: {"ok": True, "copied": 0, "removed": 0, "bytes": 0, "seconds": 0.0, "delete_seconds": 0.0, "error": None, "strategy": None}
+        for dest in destinations
+    }
+
+    def fail(dest, error):
+        results[dest].update(ok=False, error=str(error))
+        print(f"[ERROR] Sync to {dest} failed: {error}")
+
+    manifest = None
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        if mode == 'full':
+            sample = first_file(src_path)
+            tree = scan_tree(src_path)
+            tree_bytes = sum(e[0] for e in tree.values())
+
+            def run_full(dest):
+                print(f"[SYNC] Syncing to {dest}")
+                start = time.perf_counter()
+                try:
+                    strategy = resolve_strategy(config, dest, sample)
+                    results[dest]["strategy"] = strategy
+                    delete_if_exists(dest)
+                    results[dest]["delete_seconds"] = time.perf_counter() - start
+                    copy_folder(src_path, dest, strategy)
+                    results[dest].update(copied=len(tree), bytes=tree_bytes)
+                except (OSError, shutil.Error) as e:
+                    fail(dest, e)
+                results[dest]["seconds"] = time.perf_counter() - start
+            for done, _ in enumerate(pool.map(run_full, destinations), 1):
+                if on_progress:
+                    on_progress(done, len(destinations))
+        else:
+            if use_manifest:
+                manifest = load_manifest(config['name'])
+                manifest['output'], hashed = update_tree_manifest(manifest['output'], src_path)
+                print(f"[SYNC] Manifest updated ({hashed} of {len(manifest['output'])} file(s) re-hashed).")
+            build_changes = None
+            if manifest and before is not None:
+                build_changes = diff_manifests(manifest['output'], before)
+                changed_bytes = sum(manifest['output'][rel][0] for rel in build_changes[0])
+                print(f"[SYNC] Build changed {len(build_changes[0])} file(s) ({format_bytes(changed_bytes)}) and removed {len(build_changes[1])}.")
+
+            def plan(dest):
+                start = time.perf_counter()
+                dest_manifest = manifest['destinations'].get(dest) if manifest else None
+                source_manifest = manifest['output'] if manifest else None
+                try:
+                    if build_changes is not None and dest_manifest == before and os.path.isdir(dest):
+                        changed, stale = build_changes
+                    else:
+                        changed, stale = plan_destination(src_path, dest, source_manifest, dest_manifest, use_hash)
+                    if changed:
+                        results[dest]["strategy"] = resolve_strategy(config, dest, os.path.join(src_path, changed[0]))
+                    return dest, (changed, stale)
+                except OSError as e:
+                    fail(dest, e)
+                    return dest, None
+                finally:
+                    results[dest]["seconds"] += time.perf_counter() - start
+
+            plans = {dest: p for dest, p in pool.map(plan, destinations) if p is not None}
+            strategies = {dest: results[dest]["strategy"] or 'copy' for dest in plans}
+            if mode == 'staged':
+                def run_staged(dest):
+                    changed, stale = plans[dest]
+                    if not changed and not stale:
+                        return
+                    start = time.perf_counter()
+                    try:
+                        sync_staged(src_path, dest, strategies[dest])
+                    except (OSError, shutil.Error) as e:
+                        fail(dest, e)
+                    results[dest]["seconds"] += time.perf_counter() - start
+                for done, _ in enumerate(pool.map(run_staged, plans), 1):
+                    if on_progress:
+                        on_progress(done, len(plans))
+            else:
+                # Stale entries go first: a file the build turned into a folder (or the reverse) would
+                # otherwise block publishing the new entries
+                for dest, (_, stale) in plans.items():
+                    start = time.perf_counter()
+                    try:
+                        remove_stale(dest, stale)
+                    except OSError as e:
+                        fail(dest, e)
+                    results[dest]["delete_seconds"] = time.perf_counter() - start
+                    results[dest]["seconds"] += results[dest]["delete_seconds"]
+                ready = {dest: p for dest, p in plans.items() if results[dest]["ok"]}
+                failures, timings = fan_out(src_path, ready, strategies, pool, on_progress)
+                for dest, error in failures.items():
+                    fail(dest, error)
+                for dest, seconds in timings.items():
+                    results[dest]["seconds"] += seconds
+            sizes = manifest['output'] if manifest else None
+            for dest, (changed, stale) in plans.items():
+                if not results[dest]["ok"]:
+                    continue
+                published = changed
+                if mode == 'staged' and (changed or stale):
+                    # The whole tree was rebuilt in staging and swapped in, not just the changed files
+                    if sizes is None:
+                        sizes = scan_tree(src_path)
+                    published = list(sizes)
+                if sizes is None and published:
+                    sizes = scan_tree(src_path)
+                copied_bytes = sum(sizes[rel][0] for rel in published if rel in sizes)
+                results[dest].update(copied=len(published), removed=len(stale), bytes=copied_bytes)
+                via = f" via {results[dest]['strategy'] or 'copy'}" if published else ""
+                print(f"[SYNC] {dest}: {len(published)} file(s) published{via}, {len(stale)} stale file(s) removed.")
+            if manifest:
+                for dest in destinations:
+                    if results[dest]["ok"]:
+                        manifest['destinations'][dest] = manifest['output']
+                    else:
+                        manifest['destinations'].pop(dest, None)
+                save_manifest(config['name'], manifest)
+    if manifest is None and (mode == 'full' or config.get('snapshots', DEFAULT_KEEP)):
+        # Persisted even without use_manifest, so the next full sync or snapshot only re-hashes what moved
+        try:
+            manifest = load_manifest(config['name'])
+            manifest['output'], _ = update_tree_manifest(manifest['output'], src_path)
+            if mode == 'full':
+                for dest in destinations:
+                    if results[dest]["ok"]:
+                        manifest['destinations'][dest] = manifest['output']
+                    else:
+                        manifest['destinations'].pop(dest, None)
+            save_manifest(config['name'], manifest)
+        except OSError as e:
+            print(f"[WARN] Could not update the manifest for {config['name']}: {e}")
+            manifest = None
+    if manifest and config.get('snapshots', DEFAULT_KEEP):
+        take_snapshot_async(config, manifest['output'])
+    failed = [dest for dest, r in results.items() if not r["ok"]]
+    files = sum(r["copied"] for r in results.values())
+    sent = sum(r["bytes"] for r in results.values())
+    print(f"[SYNC] Done. {len(destinations) - len(failed)}/{len(destinations)} destination(s) synced, {files} file(s), {format_bytes(sent)} written.")
+    return results
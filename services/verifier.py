@@ -0,0 +1,117 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from services.manifest import load_manifest, save_manifest, update_tree_manifest, read_cache, write_cache
+from services.syncer import fan_out, remove_stale, resolve_strategy
+from utils.file_utils import scan_tree, file_hash, first_file
+
+
+def expected_output(config):
+    # The build output manifest, refreshed by stat so only files that moved get re-hashed
+    manifest = load_manifest(config['name'])
+    if os.path.isdir(config['build_output']):
+        manifest['output'], _ = update_tree_manifest(manifest['output'], config['build_output'])
+        save_manifest(config['name'], manifest)
+    return manifest
+
+
+def verify_destination(dest, expected, cache, pool):
+    # Returns (report, new_cache); cache maps rel -> [size, mtime_ns, hash] as last seen in dest
+    report = {"missing": [], "modified": [], "extra": [], "checked": 0, "hashed": 0, "error": None}
+    try:
+        current = scan_tree(dest)
+    except OSError as e:
+        report["error"] = str(e)
+        return report, cache
+    report["missing"] = sorted(rel for rel in expected if rel not in current)
+    report["extra"] = sorted(rel for rel in current if rel not in expected)
+    seen = {}
+    to_hash = []
+    for rel, (size, mtime) in current.items():
+        if rel not in expected:
+            continue
+        cached = cache.get(rel)
+        if cached and cached[0] == size and cached[1] == mtime:
+            seen[rel] = cached
+        elif size == expected[rel][0] and mtime == expected[rel][1]:
+            # Published files keep the build output's mtime, so a matching stat means untouched
+            seen[rel] = [size, mtime, expected[rel][2]]
+        else:
+            to_hash.append((rel, size, mtime))
+
+    def hash_one(item):
+        rel, size, mtime = item
+        try:
+            return rel, [size, mtime, file_hash(os.path.join(dest, rel))]
+        except OSError:
+            return rel, [size, mtime, None]
+
+    for rel, entry in pool.map(hash_one, to_hash):
+        seen[rel] = entry
+    report["checked"] = len(seen)
+    report["hashed"] = len(to_hash)
+    report["modified"] = sorted(rel for rel, entry in seen.items() if entry[2] != expected[rel][2])
+    return report, seen
+
+
+def drifted(report):
+    return bool(report["error"] or report["missing"] or report["modified"] or report["extra"])
+
+
+def verify_library(config, workers=None):
+    manifest = expected_output(config)
+    expected = manifest['output']
+    if not expected and not os.path.isdir(config['build_output']):
+        error = f"build output not found: {config['build_output']}"
+        return {dest: {"missing": [], "modified": [], "extra": [], "checked": 0, "hashed": 0, "error": error}
+                for dest in config['destinations']}
+    cache = read_cache(config['name'], "verify") or {}
+    workers = workers or config.get('sync_workers') or min(32, (os.cpu_count() or 1) + 4)
+    reports = {}
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        # Destinations are walked concurrently; hashing inside each one shares the same pool
+        with ThreadPoolExecutor(max_workers=max(1, len(config['destinations']))) as walkers:
+            futures = {
+                dest: walkers.submit(verify_destination, dest, expected, cache.get(dest, {}), pool)
+                for dest in config['destinations']
+            }
+            for dest, future in futures.items():
+                reports[dest], cache[dest] = future.result()
+    write_cache(config['name'], "verify", {dest: cache[dest] for dest in config['destinations']})
+    return reports
+
+
+def repair_library(config, reports, workers=None):
+    # Re-publishes only missing and modified files and removes extras; clean destinations are untouched
+    src_path = config['build_output']
+    manifest = expected_output(config)
+    plans = {
+        dest: (r["missing"] + r["modified"], r["extra"])
+        for dest, r in reports.items() if drifted(r) and not r["error"]
+    }
+    if not plans:
+        return {}
+    sample = first_file(src_path)
+    strategies = {dest: resolve_strategy(config, dest, sample) for dest in plans}
+    workers = workers or config.get('sync_workers') or min(32, (os.cpu_count() or 1) + 4)
+    failures = {}
+    # Extras are removed before publishing, in case one sits where a missing file's folder must go
+    for dest, (_, extra) in plans.items():
+        try:
+            remove_stale(dest, extra)
+        except OSError as e:
+            failures[dest] = e
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        published, _ = fan_out(src_path, {d: p for d, p in plans.items() if d not in failures}, strategies, pool)
+    failures.update(published)
+    results = {}
+    for dest, (changed, extra) in plans.items():
+        error = failures.get(dest)
+        results[dest] = {"ok": error is None, "published": len(changed), "removed": len(extra), "error": str(error) if error else None}
+        if error is None:
+            manifest['destinations'][dest] = manifest['output']
+            print(f"[VERIFY] Repaired {dest}: {len(changed)} file(s) published via {strategies[dest]}, {len(extra)} removed.")
+        else:
+            manifest['destinations'].pop(dest, None)
+            print(f"[ERROR] Could not repair {dest}: {error}")
+    save_manifest(config['name'], manifest)
+    return results
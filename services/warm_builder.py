@@ -0,0 +1,141 @@
+import re
+import threading
+import time
+from services.builder import BuildProcess
+from utils.file_utils import scan_tree
+
+# Angular CLI / ng-packagr messages printed at the end of an incremental build, successful or not
+DEFAULT_DONE_PATTERN = (
+    r"Compilation complete|Build at:|Built .+ successfully|Application bundle generation complete"
+    r"|Compilation failed|Build failed|Application bundle generation failed|Failed to compile"
+)
+DEFAULT_FAIL_PATTERN = r"Compilation failed|Build failed|Application bundle generation failed|Failed to compile|\bERROR\b|error TS\d+"
+DEFAULT_SETTLE_SECONDS = 1.5
+BACKOFF_START = 1.0
+BACKOFF_MAX = 60.0
+# A process that stayed up this long counts as healthy, so the next crash restarts quickly again
+STABLE_SECONDS = 60.0
+
+
+def watch_command(config):
+    return config.get('watch_command') or f"{config['build_command']} --watch"
+
+
+class WarmBuilder:
+    # Keeps one long-lived watch-mode build process per library, restarting it with exponential
+    # backoff when it dies. An incremental build counts as finished when the output prints a done
+    # marker, or, failing that, when build_output stops changing for settle_seconds. Each finished
+    # build whose output differs from the last one calls on_built(config, started).
+    def __init__(self, config, on_built, on_line=print):
+        self.library = config
+        self.config = dict(config, build_command=watch_command(config))
+        self.name = config['name']
+        self.output = config['build_output']
+        self.on_built = on_built
+        self.on_line = on_line
+        self.done_pattern = re.compile(config.get('build_done_pattern', DEFAULT_DONE_PATTERN))
+        self.fail_pattern = re.compile(config.get('build_fail_pattern', DEFAULT_FAIL_PATTERN))
+        self.settle_seconds = config.get('settle_seconds', DEFAULT_SETTLE_SECONDS)
+        self.stopped = threading.Event()
+        self.lock = threading.Lock()
+        self.building_since = None
+        self.failed = False
+        self.last_line = 0.0
+        self.last_signature = None
+        self.saw_marker = False
+        self.stats = {"backend": "warm-build", "watches": 0, "memory_bytes": 0, "restarts": 0, "builds": 0}
+        self.threads = []
+
+    def start(self):
+        self.last_signature = self._signature()
+        for target, label in ((self._supervise, "warm"), (self._watch_output, "settle")):
+            t = threading.Thread(target=target, name=f"{label}-{self.name}", daemon=True)
+            t.start()
+            self.threads.append(t)
+        return self
+
+    def stop(self):
+        self.stopped.set()
+
+    def join(self, timeout=None):
+        for t in self.threads:
+            t.join(timeout)
+
+    def _signature(self):
+        try:
+            return frozenset(scan_tree(self.output).items())
+        except OSError:
+            return None
+
+    def _completed(self, how):
+        signature = self._signature()
+        with self.lock:
+            started, self.building_since = self.building_since, None
+            failed, self.failed = self.failed, False
+            if failed:
+                print(f"[BUILD] {self.name} incremental build failed; waiting for the next change.")
+                return
+            if not signature or signature == self.last_signature:
+                return
+            self.last_signature = signature
+            self.stats["builds"] += 1
+        took = f" in {time.time() - started:.2f}s" if started else ""
+        print(f"[BUILD] {self.name} incremental build finished{took} ({how}).")
+        try:
+            self.on_built(self.library, started)
+        except Exception as e:
+            print(f"[ERROR] {self.name}: post-build hook failed: {e}")
+
+    def _handle_line(self, line):
+        with self.lock:
+            self.last_line = time.monotonic()
+            if self.building_since is None:
+                # A new build starts; errors from the previous one no longer apply
+                self.building_since = time.time()
+                self.failed = False
+            if self.fail_pattern.search(line):
+                self.failed = True
+        if self.on_line:
+            self.on_line(line)
+        if self.done_pattern.search(line):
+            self.saw_marker = True
+            self._completed("done marker")
+
+    def _supervise(self):
+        backoff = BACKOFF_START
+        while not self.stopped.is_set():
+            print(f"[BUILD] Starting warm build for {self.name}: {self.config['build_command']}")
+            started = time.monotonic()
+            process = BuildProcess(self.config, cancel_event=self.stopped)
+            try:
+                for line in process:
+                    self._handle_line(line)
+            except OSError as e:
+                print(f"[ERROR] Could not start warm build for {self.name}: {e}")
+            if self.stopped.is_set():
+                break
+            if time.monotonic() - started > STABLE_SECONDS:
+                backoff = BACKOFF_START
+            self.stats["restarts"] += 1
+            print(f"[WARN] Warm build for {self.name} exited with status {process.returncode}; restarting in {backoff:.0f}s.")
+            if self.stopped.wait(backoff):
+                break
+            backoff = min(backoff * 2, BACKOFF_MAX)
+
+    def _watch_output(self):
+        # Fallback for build tools without a recognizable done marker; once a marker has been seen,
+        # a pause in the middle of a build must not be mistaken for the end of it
+        previous = self.last_signature
+        changed_at = None
+        while not self.stopped.wait(0.5):
+            if self.saw_marker:
+                # A failed build whose tool prints no done marker for failures ends once it goes quiet
+                if self.failed and time.monotonic() - self.last_line >= self.settle_seconds:
+                    self._completed("failed, output quiet")
+                continue
+            signature = self._signature()
+            if signature != previous:
+                previous, changed_at = signature, time.monotonic()
+            elif changed_at and time.monotonic() - changed_at >= self.settle_seconds:
+                changed_at = None
+                self._completed("output settled")
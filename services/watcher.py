@@ -1,25 +1,103 @@
 import os
+import threading
 from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler
 from services.builder import build_library
-from services.syncer import sync_output
+from services.syncer import sync_output, snapshot_output
+from services.scheduler import DebouncedScheduler
+from services.metrics import SyncRun, sync_status, STATUS_BUILD_FAILED
+from services.poller import PollingWatcher, DEFAULT_POLL_INTERVAL
+from services.warm_builder import WarmBuilder
+from utils.path_filter import path_filter_for
+
+# Read-only accesses (including our own hashing) must not count as changes
+IGNORED_EVENT_TYPES = {'opened', 'closed_no_write'}
+# Kernel memory per inotify watch on 64-bit Linux, used for the native backend's estimate
+INOTIFY_WATCH_BYTES = 1080
+
+
+def rebuild(config, paths, first_event=None):
+    print(f"[CHANGE] {len(paths)} change(s) in {config['name']}, rebuilding...")
+    run = SyncRun(config['name'], "watch", first_event)
+    success = True
+    before = None
+    # In warm mode the long-lived watch process has already rebuilt the output
+    if config.get('build_mode') != 'warm':
+        before = snapshot_output(config)
+        with run.span("build"):
+            success, _ = build_library(config)
+    if not success:
+        run.finish(STATUS_BUILD_FAILED)
+        return
+    with run.span("sync"):
+        results = sync_output(config, before=before)
+    run.add_sync_results(results)
+    run.finish(sync_status(results))
 
 
 class ChangeHandler(FileSystemEventHandler):
-    def __init__(self, config):
+    def __init__(self, config, scheduler=None):
         self.config = config
+        self.scheduler = scheduler or DebouncedScheduler(
+            lambda _, paths, first_event: rebuild(config, paths, first_event),
+            config.get('debounce_seconds', 0.5)
+        )
+        self.path_filter = path_filter_for(config)
+
+    def notify(self, path):
+        if path and self.path_filter.matches(path):
+            self.scheduler.notify(self.config['name'], path)
+            return True
+        return False
 
     def on_any_event(self, event):
-        if event.is_directory:
+        if event.is_directory or event.event_type in IGNORED_EVENT_TYPES:
             return
-        print(f"[CHANGE] Detected change in {event.src_path}")
-        build_library(self.config)
-        sync_output(self.config)
+        for path in (event.src_path, getattr(event, 'dest_path', '')):
+            if self.notify(path):
+                return
+
+
+def report_watch(config, stats):
+    print(
+        f"[WATCH] {config['name']}: {stats['backend']} backend, {stats['watches']} watch(es), "
+        f"~{stats['memory_bytes'] / 1024:.0f} KB"
+    )
+
+
+def report_when_ready(observer, config):
+    observer.ready.wait()
+    report_watch(config, observer.stats)
+
+
+def count_native_watches(roots, stats, config):
+    # inotify adds one watch per directory below each root, excluded or not
+    stats["watches"] = sum(1 for root in roots for _ in os.walk(root))
+    stats["memory_bytes"] = stats["watches"] * INOTIFY_WATCH_BYTES
+    report_watch(config, stats)
 
 
-def start_watcher(config):
-    path = config['src']
-    event_handler = ChangeHandler(config)
+def start_watcher(config, scheduler=None):
+    # Only the directories the include globs can match are watched; with no include, the whole src
+    event_handler = ChangeHandler(config, scheduler)
+    if config.get('build_mode') == 'warm':
+        # The build tool watches the sources itself; we only hear about finished builds
+        return WarmBuilder(
+            config, lambda lib, _: event_handler.scheduler.notify(lib['name'], lib['build_output'])
+        ).start()
+    roots = event_handler.path_filter.watch_roots()
+    if config.get('watcher', 'native') == 'polling':
+        observer = PollingWatcher(
+            roots, event_handler.path_filter, event_handler.notify,
+            config.get('poll_interval', DEFAULT_POLL_INTERVAL), config['name']
+        )
+        observer.start()
+        threading.Thread(target=report_when_ready, args=(observer, config), daemon=True).start()
+        return observer
     observer = Observer()
-    observer.schedule(event_handler, path, recursive=True)
+    for root in roots:
+        observer.schedule(event_handler, root, recursive=True)
     observer.start()
+    observer.stats = {"backend": "native", "watches": 0, "memory_bytes": 0}
+    threading.Thread(target=count_native_watches, args=(roots, observer.stats, config), daemon=True).start()
+    return observer
@@ -0,0 +1,76 @@
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.config_store import ConfigStore, ConfigError, validate
+
+
+class OverlappingDestinationsTest(unittest.TestCase):
+    def setUp(self):
+        self.work = tempfile.mkdtemp(prefix="locallibsync-test-")
+        self.path = os.path.join(self.work, "projects.json")
+
+    def tearDown(self):
+        shutil.rmtree(self.work, ignore_errors=True)
+
+    def store(self, destinations):
+        libraries = [
+            {"name": name, "src": "src", "build_output": "dist", "build_command": "ng build", "destinations": [os.path.join(self.work, d)]}
+            for name, d in destinations.items()
+        ]
+        with open(self.path, "w") as f:
+            json.dump({"libraries": libraries}, f)
+        return ConfigStore(self.path)
+
+    def test_nested_destination_found_past_a_sibling_prefix(self):
+        # "lib-extra" sorts between "lib" and "lib/nested", which used to end the scan early
+        store = self.store({"a": "lib", "b": "lib-extra", "c": "lib/nested"})
+        self.assertEqual(
+            store.overlapping_destinations(),
+            [(os.path.join(self.work, "lib"), os.path.join(self.work, "lib", "nested"), ["a", "c"])],
+        )
+
+    def test_shared_and_deeply_nested_destinations(self):
+        store = self.store({"a": "app", "b": "app/x/y/z"})
+        self.assertEqual(len(store.overlapping_destinations()), 1)
+        self.assertEqual(self.store({"a": "one", "b": "two"}).overlapping_destinations(), [])
+
+
+class ValidateDependsOnTest(unittest.TestCase):
+    def libraries(self, deps):
+        return {"libraries": [
+            {"name": name, "src": "src", "build_output": "dist", "build_command": "ng build", "destinations": [f"apps/{name}"], "depends_on": d}
+            for name, d in deps.items()
+        ]}
+
+    def test_cycle_is_a_config_error(self):
+        with self.assertRaises(ConfigError) as ctx:
+            validate(self.libraries({"core": ["ui"], "ui": ["forms"], "forms": ["core"], "app": ["ui"]}))
+        self.assertEqual(ctx.exception.errors, ["depends_on cycle between: core, forms, ui"])
+
+    def test_acyclic_graph_is_accepted(self):
+        validate(self.libraries({"core": [], "ui": ["core"], "forms": ["core", "ui"]}))
+
+
+class ValidateNumbersTest(unittest.TestCase):
+    def library(self, **options):
+        return dict({"name": "lib", "src": "src", "build_output": "dist", "build_command": "ng build", "destinations": ["app"]}, **options)
+
+    def test_counts_must_be_integers(self):
+        for key in ("max_output_lines", "snapshots", "sync_workers"):
+            with self.assertRaises(ConfigError) as ctx:
+                validate({"libraries": [self.library(**{key: 2.5})]})
+            self.assertEqual(ctx.exception.errors, [f"library 'lib': '{key}' must be a non-negative integer"])
+        validate({"libraries": [self.library(max_output_lines=200, snapshots=0, sync_workers=4)]})
+
+    def test_durations_accept_fractions(self):
+        validate({"libraries": [self.library(debounce_seconds=0.25, settle_seconds=1.5, snapshot_store_mb=0.5)]})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,112 @@
+import os
+import sys
+import threading
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.jobs import JobQueue, PRIORITY_LOW, PRIORITY_NORMAL, PRIORITY_HIGH
+
+
+class JobQueueTest(unittest.TestCase):
+    def setUp(self):
+        self.order = []
+        self.lock = threading.Lock()
+        self.queues = []
+
+    def tearDown(self):
+        for q in self.queues:
+            q.shutdown()
+
+    def queue(self, workers):
+        q = JobQueue(workers)
+        self.queues.append(q)
+        return q
+
+    def record(self, name, gate=None, started=None):
+        def fn(cancel_event):
+            if started:
+                started.set()
+            if gate:
+                gate.wait(5)
+            with self.lock:
+                self.order.append(name)
+            return name
+        return fn
+
+    def blocker(self, q, key="busy"):
+        # Occupies a worker until the returned gate is set
+        gate, started = threading.Event(), threading.Event()
+        job = q.submit(key, self.record(key, gate, started))
+        self.assertTrue(started.wait(5))
+        return job, gate
+
+    def test_same_key_is_serialized_other_keys_run_alongside(self):
+        q = self.queue(2)
+        first, gate = self.blocker(q, "lib")
+        second = q.submit("lib", self.record("lib again"), label="verify lib")
+        other = q.submit("other", self.record("other"))
+        self.assertTrue(other.done.wait(5))
+        self.assertEqual(second.state, "queued")
+        gate.set()
+        self.assertTrue(second.done.wait(5))
+        self.assertEqual(self.order, ["other", "lib", "lib again"])
+        self.assertGreaterEqual(second.started, first.finished)
+
+    def test_only_same_key_and_label_collapse(self):
+        q = self.queue(1)
+        _, gate = self.blocker(q)
+        sync = q.submit("lib", self.record("sync"), PRIORITY_LOW)
+        self.assertIs(q.submit("lib", self.record("sync twice"), PRIORITY_HIGH), sync)
+        self.assertEqual(sync.priority, PRIORITY_HIGH)
+        verify = q.submit("lib", self.record("verify"), label="verify lib")
+        self.assertIsNot(verify, sync)
+        self.assertIsNot(q.submit("other", self.record("other")), sync)
+        gate.set()
+        for job in (sync, verify):
+            self.assertTrue(job.done.wait(5))
+        self.assertNotIn("sync twice", self.order)
+
+    def test_higher_priority_first_then_submission_order(self):
+        q = self.queue(1)
+        _, gate = self.blocker(q)
+        jobs = [
+            q.submit("a", self.record("a"), PRIORITY_LOW),
+            q.submit("b", self.record("b"), PRIORITY_NORMAL),
+            q.submit("c", self.record("c"), PRIORITY_HIGH),
+            q.submit("d", self.record("d"), PRIORITY_NORMAL),
+        ]
+        gate.set()
+        for job in jobs:
+            self.assertTrue(job.done.wait(5))
+        self.assertEqual(self.order, ["busy", "c", "b", "d", "a"])
+
+    def test_cancel_queued_job_never_runs(self):
+        q = self.queue(1)
+        _, gate = self.blocker(q)
+        job = q.submit("lib", self.record("lib"))
+        self.assertTrue(q.cancel(job.id))
+        self.assertEqual(job.state, "cancelled")
+        self.assertTrue(job.done.is_set())
+        gate.set()
+        self.assertTrue(q.submit("after", self.record("after")).done.wait(5))
+        self.assertEqual(self.order, ["busy", "after"])
+
+    def test_cancel_running_job_signals_it(self):
+        q = self.queue(1)
+        started = threading.Event()
+
+        def fn(cancel_event):
+            started.set()
+            return cancel_event.wait(5)
+
+        job = q.submit("lib", fn)
+        self.assertTrue(started.wait(5))
+        self.assertTrue(q.cancel(job.id))
+        self.assertTrue(job.done.wait(5))
+        self.assertEqual((job.state, job.result), ("cancelled", True))
+        self.assertFalse(q.cancel(job.id))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,42 @@
+import os
+import shutil
+import sys
+import tempfile
+import time
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.metrics import SyncRun, sync_status, STATUS_OK, STATUS_SYNC_FAILED
+
+
+class SyncRunSpansTest(unittest.TestCase):
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.work = tempfile.mkdtemp(prefix="locallibsync-test-")
+        os.chdir(self.work)
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        shutil.rmtree(self.work, ignore_errors=True)
+
+    def test_queue_wait_is_separate_from_debounce_wait(self):
+        now = time.time()
+        record = SyncRun("lib", "watch", first_event=now - 3, queued=now - 1).finish(STATUS_OK)
+        self.assertAlmostEqual(record["spans"]["debounce_wait"], 2, delta=0.05)
+        self.assertAlmostEqual(record["spans"]["queue_wait"], 1, delta=0.05)
+        self.assertAlmostEqual(record["spans"]["total"], 3, delta=0.05)
+
+    def test_unqueued_run_has_no_queue_wait(self):
+        record = SyncRun("lib", "watch", first_event=time.time() - 1).finish(STATUS_OK)
+        self.assertAlmostEqual(record["spans"]["debounce_wait"], 1, delta=0.05)
+        self.assertNotIn("queue_wait", record["spans"])
+
+    def test_sync_status(self):
+        self.assertEqual(sync_status({"a": {"ok": True}}), STATUS_OK)
+        self.assertEqual(sync_status({"a": {"ok": True}, "b": {"ok": False}}), STATUS_SYNC_FAILED)
+        self.assertEqual(sync_status({}), STATUS_SYNC_FAILED)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,105 @@
+import os
+import sys
+import threading
+import time
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.scheduler import DebouncedScheduler
+
+WINDOW = 0.05
+
+
+class Recorder:
+    # Action that records each call and, while `gate` is clear, blocks so a run can be held open
+    def __init__(self):
+        self.calls = []
+        self.lock = threading.Lock()
+        self.active = {}
+        self.max_active = {}
+        self.started = threading.Semaphore(0)
+        self.gate = threading.Event()
+        self.gate.set()
+
+    def __call__(self, key, paths, first_event):
+        with self.lock:
+            self.active[key] = self.active.get(key, 0) + 1
+            self.max_active[key] = max(self.max_active.get(key, 0), self.active[key])
+            self.calls.append((key, set(paths), first_event))
+        self.started.release()
+        self.gate.wait(5)
+        with self.lock:
+            self.active[key] -= 1
+
+    def wait_started(self, count=1):
+        for _ in range(count):
+            if not self.started.acquire(timeout=5):
+                raise AssertionError("scheduled run did not start")
+
+
+def settle():
+    # Longer than the quiet window, so any run that was going to fire has fired
+    time.sleep(WINDOW * 6)
+
+
+class DebouncedSchedulerTest(unittest.TestCase):
+    def test_burst_is_coalesced_into_one_run(self):
+        action = Recorder()
+        scheduler = DebouncedScheduler(action, WINDOW)
+        before = time.time()
+        for i in range(5):
+            scheduler.notify("lib", f"src/file{i}.ts")
+        action.wait_started()
+        settle()
+        self.assertEqual(len(action.calls), 1)
+        key, paths, first_event = action.calls[0]
+        self.assertEqual((key, paths), ("lib", {f"src/file{i}.ts" for i in range(5)}))
+        self.assertGreaterEqual(first_event, before)
+        self.assertLess(first_event, before + WINDOW)
+
+    def test_events_during_a_run_queue_exactly_one_follow_up(self):
+        action = Recorder()
+        scheduler = DebouncedScheduler(action, WINDOW)
+        action.gate.clear()
+        scheduler.notify("lib", "a.ts")
+        action.wait_started()
+        for name in ("b.ts", "c.ts", "d.ts"):
+            scheduler.notify("lib", name)
+        settle()
+        self.assertEqual(len(action.calls), 1)
+        action.gate.set()
+        action.wait_started()
+        settle()
+        self.assertEqual([paths for _, paths, _ in action.calls], [{"a.ts"}, {"b.ts", "c.ts", "d.ts"}])
+
+    def test_same_key_never_overlaps_but_other_keys_run(self):
+        action = Recorder()
+        scheduler = DebouncedScheduler(action, WINDOW)
+        action.gate.clear()
+        scheduler.notify("one")
+        action.wait_started()
+        scheduler.notify("two")
+        # "two" starts while "one" is still held open
+        action.wait_started()
+        scheduler.notify("one")
+        settle()
+        action.gate.set()
+        action.wait_started()
+        settle()
+        self.assertEqual([key for key, _, _ in action.calls], ["one", "two", "one"])
+        self.assertEqual(action.max_active, {"one": 1, "two": 1})
+
+    def test_quiet_window_per_key(self):
+        action = Recorder()
+        windows = {"fast": WINDOW, "slow": WINDOW * 20}
+        scheduler = DebouncedScheduler(action, windows.get)
+        scheduler.notify("slow")
+        scheduler.notify("fast")
+        action.wait_started()
+        self.assertEqual([key for key, _, _ in action.calls], ["fast"])
+        scheduler.cancel_all()
+
+
+if __name__ == "__main__":
+    unittest.main()
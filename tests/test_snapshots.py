@@ -0,0 +1,64 @@
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services import snapshots
+from services.manifest import update_tree_manifest
+
+
+class ConcurrentSnapshotTest(unittest.TestCase):
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.work = tempfile.mkdtemp(prefix="locallibsync-test-")
+        os.chdir(self.work)
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        shutil.rmtree(self.work, ignore_errors=True)
+
+    def library(self, i):
+        out = os.path.join(self.work, f"lib{i}", "dist")
+        return {"name": f"lib{i}", "build_output": out, "destinations": [os.path.join(self.work, f"app{i}")], "snapshots": 3}
+
+    def build_and_snapshot(self, config, round_no):
+        out = config['build_output']
+        os.makedirs(out, exist_ok=True)
+        for f in range(20):
+            with open(os.path.join(out, f"file{f}.mjs"), "w") as fh:
+                fh.write(f"// {config['name']} round {round_no} file {f}\n" * 50)
+        manifest, _ = update_tree_manifest({}, out)
+        return snapshots.take_snapshot(config, manifest)
+
+    def test_parallel_snapshots_keep_index_and_blobs_consistent(self):
+        libraries = [self.library(i) for i in range(4)]
+        rounds = 15
+        with ThreadPoolExecutor(max_workers=len(libraries)) as pool:
+            for round_no in range(rounds):
+                ids = list(pool.map(lambda lib: self.build_and_snapshot(lib, round_no), libraries))
+                self.assertTrue(all(ids))
+
+        index = snapshots.load_index()
+        for lib in libraries:
+            self.assertEqual(len(snapshots.list_snapshots(lib['name'])), lib['snapshots'])
+        for snap in index["snapshots"]:
+            for _, digest in snap["files"].values():
+                self.assertTrue(os.path.exists(snapshots._shard(snapshots.BLOB_DIR, digest)), digest)
+        self.assertEqual(index["store_bytes"], snapshots.live_size(index))
+        self.assertEqual(index["store_bytes"], snapshots.store_size())
+        self.assertEqual([n for n in os.listdir(snapshots.STORE_DIR) if n.endswith(".tmp")], [])
+
+        # Every stored snapshot can still be restored
+        lib = libraries[0]
+        oldest = snapshots.list_snapshots(lib['name'])[-1]
+        snapshots.restore_snapshot(lib, oldest["id"])
+        with open(os.path.join(lib['destinations'][0], "file0.mjs")) as fh:
+            self.assertIn(f"round {rounds - lib['snapshots']} ", fh.read())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.syncer import sync_output
+
+
+def write(path, text):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        f.write(text)
+
+
+def read(path):
+    with open(path) as f:
+        return f.read()
+
+
+class DeltaSyncLayoutChangeTest(unittest.TestCase):
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.work = tempfile.mkdtemp(prefix="locallibsync-test-")
+        os.chdir(self.work)
+        self.out = os.path.join(self.work, "dist")
+        self.dest = os.path.join(self.work, "app", "node_modules", "lib")
+        self.config = {"name": "lib", "build_output": self.out, "destinations": [self.dest], "snapshots": 0}
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        shutil.rmtree(self.work, ignore_errors=True)
+
+    def sync(self):
+        results = sync_output(self.config, retries=1, delay=0)
+        self.assertTrue(results[self.dest]["ok"], results[self.dest]["error"])
+
+    def test_file_replaced_by_folder(self):
+        write(os.path.join(self.out, "esm"), "flat bundle")
+        self.sync()
+        os.remove(os.path.join(self.out, "esm"))
+        write(os.path.join(self.out, "esm", "index.mjs"), "split bundle")
+        self.sync()
+        self.assertEqual(read(os.path.join(self.dest, "esm", "index.mjs")), "split bundle")
+
+    def test_folder_replaced_by_file(self):
+        write(os.path.join(self.out, "esm", "index.mjs"), "split bundle")
+        self.sync()
+        shutil.rmtree(os.path.join(self.out, "esm"))
+        write(os.path.join(self.out, "esm"), "flat bundle")
+        self.sync()
+        self.assertEqual(read(os.path.join(self.dest, "esm")), "flat bundle")
+
+    def test_untracked_file_blocking_a_folder(self):
+        write(os.path.join(self.out, "index.js"), "entry")
+        self.sync()
+        # Not in any manifest, so only the publish step can notice it
+        write(os.path.join(self.dest, "types"), "left over")
+        write(os.path.join(self.out, "types", "index.d.ts"), "typings")
+        self.sync()
+        self.assertEqual(read(os.path.join(self.dest, "types", "index.d.ts")), "typings")
+
+
+class StagedSyncReportTest(unittest.TestCase):
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.work = tempfile.mkdtemp(prefix="locallibsync-test-")
+        os.chdir(self.work)
+        self.out = os.path.join(self.work, "dist")
+        self.dest = os.path.join(self.work, "app", "node_modules", "lib")
+        for i in range(5):
+            write(os.path.join(self.out, f"file{i}.mjs"), "x" * 100)
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        shutil.rmtree(self.work, ignore_errors=True)
+
+    def test_staged_reports_the_whole_rewritten_tree(self):
+        config = {"name": "lib", "build_output": self.out, "destinations": [self.dest], "sync_mode": "staged", "snapshots": 0}
+        sync_output(config, retries=1, delay=0)
+        write(os.path.join(self.out, "file0.mjs"), "y" * 100)
+        result = sync_output(config, retries=1, delay=0)[self.dest]
+        self.assertEqual((result["copied"], result["bytes"]), (5, 500))
+        result = sync_output(config, retries=1, delay=0)[self.dest]
+        self.assertEqual((result["copied"], result["bytes"]), (0, 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
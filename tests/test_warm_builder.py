@@ -0,0 +1,46 @@
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.warm_builder import WarmBuilder
+
+
+class WarmBuilderOutputTest(unittest.TestCase):
+    def setUp(self):
+        self.work = tempfile.mkdtemp(prefix="locallibsync-test-")
+        self.out = os.path.join(self.work, "dist")
+        os.makedirs(self.out)
+        self.built = []
+        config = {"name": "lib", "src": self.work, "build_output": self.out, "build_command": "ng build"}
+        self.builder = WarmBuilder(config, lambda lib, started: self.built.append(lib['name']), on_line=None)
+        self.builder.last_signature = self.builder._signature()
+
+    def tearDown(self):
+        shutil.rmtree(self.work, ignore_errors=True)
+
+    def build(self, version, lines):
+        with open(os.path.join(self.out, "index.mjs"), "w") as f:
+            f.write(f"export const version = {version};\n")
+        os.utime(os.path.join(self.out, "index.mjs"), ns=(version * 10**9, version * 10**9))
+        for line in lines:
+            self.builder._handle_line(line)
+
+    def test_successful_build_after_a_failed_one_is_synced(self):
+        self.build(1, ["Building...", "Application bundle generation complete. [1.2 seconds]"])
+        self.build(2, ["[ERROR] TS2322: Type 'string' is not assignable", "Application bundle generation failed. [0.8 seconds]"])
+        self.build(3, ["Building...", "Application bundle generation complete. [0.9 seconds]"])
+        self.assertEqual(self.built, ["lib", "lib"])
+        self.assertFalse(self.builder.failed)
+        self.assertIsNone(self.builder.building_since)
+
+    def test_failed_build_is_not_synced(self):
+        self.build(1, ["error TS2304: Cannot find name 'foo'.", "Compilation failed."])
+        self.assertEqual(self.built, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
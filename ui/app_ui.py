@@ -1,26 +1,29 @@
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox, simpledialog
-import json
 import os
+import queue
 import threading
 import time
-import subprocess
-from services.syncer import sync_output
-from services.builder import build_library
+from services.jobs import JobQueue, PRIORITY_HIGH, PRIORITY_LOW
+from services.metrics import (
+    SyncRun, read_history, sync_status, STATUS_OK, STATUS_BUILD_FAILED, STATUS_CANCELLED
+)
+from services.config_store import ConfigStore, ConfigError
+from services.manifest import read_cache, write_cache
+# The sync engine, builder, verifier and daemon client (urllib) are imported where first used,
+# so none of them delay the first paint of the window
 
 CONFIG_PATH = "config/projects.json"
-
-def load_projects():
-    if not os.path.exists(CONFIG_PATH):
-        return []
-    with open(CONFIG_PATH, "r") as f:
-        data = json.load(f)
-        return data.get("libraries", [])
-
-def save_projects(projects):
-    os.makedirs("config", exist_ok=True)
-    with open(CONFIG_PATH, "w") as f:
-        json.dump({"libraries": projects}, f, indent=4)
+MAX_LOG_LINES = 2000
+UI_DRAIN_INTERVAL_MS = 50
+CONFIG_POLL_INTERVAL_MS = 1000
+# Cards are created this many per Tk tick so a large config never blocks the first paint
+CARD_BATCH_SIZE = 20
+VERIFY_DELAY_MS = 2000
+VERSION_COMMANDS = {
+    "Node": "node -v",
+    "Angular": "ng version | grep 'Angular CLI' || true",
+}
 
 class ToolTip:
     def __init__(self, widget, text):
@@ -46,15 +49,32 @@ class ToolTip:
             self.tipwindow = None
 
 def get_version(cmd):
+    import subprocess
     try:
         return subprocess.check_output(cmd, shell=True, text=True).strip()
     except Exception:
         return "?"
 
-def add_or_edit_project(idx=None, refresh_list=None):
-    # idx=None for add, otherwise edit
-    if idx is not None:
-        proj = projects[idx]
+def cached_versions():
+    return read_cache("tools", "versions") or {}
+
+def probe_versions(on_done):
+    # Runs in a background thread: shelling out to ng takes seconds, so the window shows the last
+    # known versions from the cache until this finishes
+    versions = {tool: get_version(cmd) for tool, cmd in VERSION_COMMANDS.items()}
+    try:
+        write_cache("tools", "versions", versions)
+    except OSError:
+        pass
+    on_done(versions)
+
+def version_text(versions):
+    return "   |   ".join(f"{tool}: {versions.get(tool, '…')}" for tool in VERSION_COMMANDS)
+
+def add_or_edit_project(name=None):
+    # name=None for add, otherwise edit; the store notifies the main window, which redraws that one card
+    if name is not None:
+        proj = store.get(name)
         title = f"Edit Library: {proj['name']}"
     else:
         proj = {
@@ -202,18 +222,21 @@ def add_or_edit_project(idx=None, refresh_list=None):
         if not all([new_proj["name"], new_proj["src"], new_proj["build_output"], new_proj["build_command"], new_proj["destinations"]]):
             messagebox.showwarning("Missing Data", "All fields are required and at least one destination.")
             return
-        if idx is not None:
-            projects[idx] = new_proj
-        else:
-            projects.append(new_proj)
-        save_projects(projects)
-        if refresh_list:
-            refresh_list()
+        try:
+            store.upsert(new_proj, old_name=name)
+        except ConfigError as e:
+            messagebox.showwarning("Invalid Library", "\n".join(e.errors))
+            return
+        overlaps = [o for o in store.overlapping_destinations() if new_proj["name"] in o[2]]
+        if overlaps:
+            messagebox.showwarning("Overlapping Destinations", "\n".join(
+                f"{path if path == other else f'{path} and {other}'}: {', '.join(names)}" for path, other, names in overlaps
+            ))
         win.destroy()
 
     style = ttk.Style(win)
     style.configure("Accent.TButton", background="#98c379", foreground="#23272e", font=("Segoe UI", 10, "bold"))
-    save_btn = ttk.Button(form, text="💾 Save Changes" if idx is not None else "➕ Add Library", command=save_edits)
+    save_btn = ttk.Button(form, text="💾 Save Changes" if name is not None else "➕ Add Library", command=save_edits)
     save_btn.grid(row=99, column=0, columnspan=3, pady=18)
     save_btn.bind("<Enter>", on_enter)
     save_btn.bind("<Leave>", on_leave)
@@ -233,8 +256,53 @@ def add_or_edit_project(idx=None, refresh_list=None):
 
 
 
+def show_sync_history():
+    win = tk.Toplevel(root)
+    win.title("Sync History")
+    win.configure(bg="#23272e")
+    win.geometry("980x420")
+    columns = ("time", "trigger", "status", "build", "sync", "total", "files", "bytes")
+    tree = ttk.Treeview(win, columns=columns, show="tree headings")
+    tree.heading("#0", text="Library / Destination")
+    tree.column("#0", width=320)
+    for col in columns:
+        tree.heading(col, text=col.capitalize())
+        tree.column(col, width=80, anchor="e")
+    tree.column("time", width=140, anchor="w")
+    scroll = ttk.Scrollbar(win, command=tree.yview)
+    tree.config(yscrollcommand=scroll.set)
+    scroll.pack(side=tk.RIGHT, fill=tk.Y)
+    tree.pack(fill=tk.BOTH, expand=True, padx=8, pady=8)
+
+    def fmt(seconds):
+        return f"{seconds:.2f}s" if seconds is not None else ""
+
+    def load():
+        tree.delete(*tree.get_children())
+        for record in reversed(read_history()):
+            spans = record.get("spans", {})
+            dests = record.get("destinations", {})
+            parent = tree.insert("", tk.END, text=record["library"], values=(
+                time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(record["started"])),
+                record.get("trigger", ""),
+                record.get("status", ""),
+                fmt(spans.get("build")),
+                fmt(spans.get("sync")),
+                fmt(spans.get("total")),
+                sum(d["files"] for d in dests.values()),
+                sum(d["bytes"] for d in dests.values()),
+            ))
+            for dest, d in dests.items():
+                tree.insert(parent, tk.END, text=f"→ {dest}", values=(
+                    "", d.get("strategy") or "", "ok" if d["ok"] else "failed", "", fmt(d["seconds"]), "", d["files"], d["bytes"]
+                ))
+
+    ttk.Button(win, text="🔄 Refresh", command=load).pack(side=tk.BOTTOM, pady=(0, 8))
+    load()
+
+
 def launch_app():
-    global root, projects
+    global root, store
     root = tk.Tk()
     root.title("LocalLibSync")
     root.geometry("1100x700")
@@ -247,7 +315,8 @@ def launch_app():
     style.configure("TButton", font=("Segoe UI", 10, "bold"), padding=8, background="#61afef", foreground="#23272e")
     style.configure("TProgressbar", thickness=12, troughcolor="#282c34", background="#61afef", bordercolor="#23272e", lightcolor="#61afef", darkcolor="#282c34")
 
-    projects = load_projects()
+    store = ConfigStore(CONFIG_PATH)
+    cards = {}
 
     main_frame = ttk.Frame(root, padding=24, style="TFrame")
     main_frame.pack(fill=tk.BOTH, expand=True)
@@ -257,9 +326,8 @@ def launch_app():
     header.pack(pady=(0, 8))
 
     # Node/Angular version
-    node_version = get_version("node -v")
-    ng_version = get_version("ng version | grep 'Angular CLI' || true")
-    tk.Label(main_frame, text=f"Node: {node_version}   |   Angular: {ng_version}", font=("Segoe UI", 10), bg="#23272e", fg="#abb2bf").pack()
+    version_label = tk.Label(main_frame, text=version_text(cached_versions()), font=("Segoe UI", 10), bg="#23272e", fg="#abb2bf")
+    version_label.pack()
 
     # Menu bar with Help (Instructions moved here)
     menubar = tk.Menu(root)
@@ -279,6 +347,9 @@ def launch_app():
         "About LocalLibSync",
         "LocalLibSync helps you build and sync Angular libraries locally with ease.\n\nCreated by Rizwan Aashiq Umar.\n\nWith ♥️"
     ))
+    viewmenu = tk.Menu(menubar, tearoff=0)
+    viewmenu.add_command(label="Sync History", command=show_sync_history)
+    menubar.add_cascade(label="View", menu=viewmenu)
     menubar.add_cascade(label="Help", menu=helpmenu)
     root.config(menu=menubar)
 
@@ -292,136 +363,462 @@ def launch_app():
     log_scroll = ttk.Scrollbar(log_frame, command=log_text.yview)
     log_scroll.pack(side=tk.RIGHT, fill=tk.Y)
     log_text.config(yscrollcommand=log_scroll.set)
+
+    # Worker threads never touch widgets: they post to ui_events and the Tk loop drains it in batches
+    ui_events = queue.Queue()
+
     def log(msg):
-        log_text.insert(tk.END, msg + "\n")
+        ui_events.put((None, msg))
+
+    def post(fn, *args, **kwargs):
+        ui_events.put((fn, (args, kwargs)))
+
+    def append_log(lines):
+        log_text.insert(tk.END, "\n".join(lines) + "\n")
+        excess = int(log_text.index("end-1c").split(".")[0]) - 1 - MAX_LOG_LINES
+        if excess > 0:
+            log_text.delete("1.0", f"{excess + 1}.0")
         log_text.see(tk.END)
+
+    def drain_ui_events():
+        lines = []
+        try:
+            for _ in range(1000):
+                fn, payload = ui_events.get_nowait()
+                if fn is None:
+                    lines.append(payload)
+                    continue
+                if lines:
+                    append_log(lines)
+                    lines = []
+                args, kwargs = payload
+                try:
+                    fn(*args, **kwargs)
+                except tk.TclError:
+                    pass
+        except queue.Empty:
+            pass
+        if lines:
+            append_log(lines)
+        root.after(UI_DRAIN_INTERVAL_MS, drain_ui_events)
+
+    def set_card(label, progress, text, fg, value=None, mode="determinate"):
+        label.config(text=text, fg=fg)
+        if str(progress["mode"]) != mode:
+            progress.stop()
+            progress.config(mode=mode)
+            if mode == "indeterminate":
+                progress.start(15)
+        if value is not None:
+            progress["value"] = value
     ttk.Button(log_frame, text="🧹 Clear Log", command=lambda: log_text.delete(1.0, tk.END)).pack(side=tk.RIGHT, padx=5, pady=2)
 
-    # Project area
-    project_frame = ttk.Frame(main_frame, style="TFrame")
-    project_frame.pack(fill=tk.BOTH, expand=True, pady=(0, 10))
+    # Job queue: one build per library at a time, at most two libraries at once
+    job_queue = JobQueue(workers=2)
+    queue_frame = ttk.Frame(main_frame, style="TFrame")
+    queue_frame.pack(fill=tk.X, expand=False, pady=(0, 10))
+    tk.Label(queue_frame, text="Job Queue", font=("Segoe UI", 10, "bold"), bg="#23272e", fg="#61afef").pack(anchor="w")
+    queue_list = tk.Listbox(queue_frame, height=3, bg="#1e222a", fg="#abb2bf", font=("Consolas", 10), bd=2, relief="groove", activestyle="none")
+    queue_list.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=(0, 2))
+    queue_jobs = []
+
+    def refresh_queue_view():
+        jobs = job_queue.snapshot()
+        labels = [f"{'▶' if j.state == 'running' else '⏳'} {j.label} ({j.state})" for j in jobs]
+        if labels != list(queue_list.get(0, tk.END)):
+            queue_list.delete(0, tk.END)
+            for text in labels:
+                queue_list.insert(tk.END, text)
+        queue_jobs[:] = jobs
+        root.after(500, refresh_queue_view)
+
+    def cancel_selected_job():
+        for i in queue_list.curselection():
+            job = queue_jobs[i] if i < len(queue_jobs) else None
+            if job and job_queue.cancel(job.id):
+                log(f"[INFO] Cancelling {job.label}...")
+                card = cards.get(job.key)
+                # A queued sync never reaches do_sync, which is what would otherwise reset its card
+                if job.state == "cancelled" and job.label == job.key and card:
+                    set_card(card.label, card.progress, f"📚 {job.key}", "#61afef", 0)
+
+    ttk.Button(queue_frame, text="⛔ Cancel", command=cancel_selected_job).pack(side=tk.RIGHT, padx=5, pady=2)
+
+    # Project area: cards live in a frame inside a scrollable canvas
+    list_frame = ttk.Frame(main_frame, style="TFrame")
+    list_frame.pack(fill=tk.BOTH, expand=True, pady=(0, 10))
+    project_canvas = tk.Canvas(list_frame, bg="#23272e", highlightthickness=0)
+    project_scroll = ttk.Scrollbar(list_frame, command=project_canvas.yview)
+    project_canvas.config(yscrollcommand=project_scroll.set)
+    project_scroll.pack(side=tk.RIGHT, fill=tk.Y)
+    project_canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+    project_frame = ttk.Frame(project_canvas, style="TFrame")
+    project_window = project_canvas.create_window((0, 0), window=project_frame, anchor="nw")
+    project_frame.bind("<Configure>", lambda e: project_canvas.config(scrollregion=project_canvas.bbox("all")))
+    project_canvas.bind("<Configure>", lambda e: project_canvas.itemconfigure(project_window, width=e.width))
 
     def add_project():
-        add_or_edit_project(refresh_list=refresh_list)
+        add_or_edit_project()
 
-    def edit_project(idx):
-        add_or_edit_project(idx, refresh_list=refresh_list)
+    def edit_project(name):
+        add_or_edit_project(name)
 
-    def remove_project(idx):
-        if messagebox.askyesno("Remove Library", f"Are you sure you want to remove '{projects[idx]['name']}'?"):
-            projects.pop(idx)
-            save_projects(projects)
-            refresh_list()
+    def remove_project(name):
+        if messagebox.askyesno("Remove Library", f"Are you sure you want to remove '{name}'?"):
+            try:
+                store.remove(name)
+            except ConfigError as e:
+                messagebox.showwarning("Cannot Remove Library", "\n".join(e.errors))
 
-    def refresh_list():
-        for widget in project_frame.winfo_children():
+    def fill_card(card, proj):
+        for widget in card.winfo_children():
             widget.destroy()
-        if not projects:
-            tk.Label(project_frame, text="No projects added yet.", font=("Segoe UI", 13, "italic"), bg="#23272e", fg="#abb2bf").pack(pady=30)
+        name = proj.get('name', 'Unnamed')
+
+        # Animated border
+        border = tk.Frame(card, bg="#61afef", height=3)
+        border.pack(fill=tk.X, side=tk.TOP)
+
+        content = tk.Frame(card, bg="#282c34", bd=2, relief="ridge", padx=10, pady=8)
+        content.pack(fill=tk.X)
+
+        # Row layout
+        label = tk.Label(
+            content,
+            text=f"📚 {name}",
+            font=("Segoe UI", 13, "bold"),
+            bg="#282c34",
+            fg="#61afef"
+        )
+        label.grid(row=0, column=0, sticky="w", padx=(0, 18))
+
+        dests = "\n".join([f"→ {d}" for d in proj.get('destinations', [])])
+        dest_label = tk.Label(
+            content,
+            text=dests,
+            font=("Segoe UI", 10),
+            bg="#282c34",
+            fg="#abb2bf",
+            justify="left"
+        )
+        dest_label.grid(row=0, column=1, sticky="w", padx=(0, 18))
+
+        progress = ttk.Progressbar(content, orient="horizontal", length=120, mode="determinate")
+        progress.grid(row=0, column=2, padx=(0, 18))
+
+        sync_btn = ttk.Button(content, text="🔄", width=3, command=lambda: start_sync(name))
+        sync_btn.grid(row=0, column=3, padx=2)
+        ToolTip(sync_btn, "Build and sync this library to all destinations")
+
+        edit_btn = ttk.Button(content, text="✏️", width=3, command=lambda: edit_project(name))
+        edit_btn.grid(row=0, column=4, padx=2)
+        ToolTip(edit_btn, "Edit this library")
+
+        del_btn = ttk.Button(content, text="🗑", width=3, command=lambda: remove_project(name))
+        del_btn.grid(row=0, column=5, padx=2)
+        ToolTip(del_btn, "Remove this library")
+
+        badge_text, badge_fg = badges.get(name, ("○ Not verified", "#5c6370"))
+        badge = tk.Label(content, text=badge_text, font=("Segoe UI", 9), bg="#282c34", fg=badge_fg, cursor="hand2")
+        badge.grid(row=1, column=0, sticky="w")
+        badge.bind("<Button-1>", lambda e: on_badge_click(name))
+        ToolTip(badge, "Destination check against the build output; click to verify or repair")
+
+        content.grid_columnconfigure(1, weight=1)
+        card.progress = progress
+        card.label = label
+        card.badge = badge
+
+    empty_label = tk.Label(project_frame, text="No projects added yet.", font=("Segoe UI", 13, "italic"), bg="#23272e", fg="#abb2bf")
+
+    def show_card(proj):
+        card = tk.Frame(project_frame, bg="#23272e", bd=0, relief="flat", padx=0, pady=0)
+        card.pack(fill=tk.X, pady=8, padx=0)
+        fill_card(card, proj)
+        cards[proj['name']] = card
+
+    pending_cards = []
+
+    def show_pending_cards():
+        # Render one batch, then yield to Tk so the window paints and stays responsive
+        for _ in range(min(CARD_BATCH_SIZE, len(pending_cards))):
+            proj = store.get(pending_cards.pop(0))
+            if proj is not None and proj['name'] not in cards:
+                show_card(proj)
+        if pending_cards:
+            root.after(1, show_pending_cards)
+
+    def update_empty_label():
+        if cards or pending_cards:
+            empty_label.pack_forget()
+        else:
+            empty_label.pack(pady=30)
+
+    def on_config_change(event, name, proj):
+        # Only the affected card is touched; the rest of the list keeps its widgets and progress
+        if name in pending_cards:
+            # Not drawn yet; the batch renderer reads the current entry when it gets there
+            if event == "removed":
+                pending_cards.remove(name)
+            update_empty_label()
+            return
+        if event == "removed":
+            card = cards.pop(name, None)
+            if card:
+                card.destroy()
+        elif event == "added":
+            show_card(proj)
+        elif name in cards:
+            fill_card(cards[name], proj)
+        update_empty_label()
+
+    def refresh_list():
+        for card in cards.values():
+            card.destroy()
+        cards.clear()
+        try:
+            libraries = store.libraries()
+        except (ConfigError, ValueError, OSError) as e:
+            log(f"[ERROR] Could not load {CONFIG_PATH}: {e}")
+            libraries = []
+        was_idle = not pending_cards
+        pending_cards[:] = [proj['name'] for proj in libraries]
+        update_empty_label()
+        if was_idle:
+            show_pending_cards()
+
+    config_error = [None]
+
+    def check_config_file():
+        try:
+            store.reload_if_changed()
+            config_error[0] = None
+        except (ConfigError, ValueError, OSError) as e:
+            # Keep showing the last good config and only report a broken file once
+            if str(e) != config_error[0]:
+                config_error[0] = str(e)
+                log(f"[ERROR] Ignoring invalid {CONFIG_PATH}: {e}")
+
+    def poll_config_file():
+        check_config_file()
+        root.after(CONFIG_POLL_INTERVAL_MS, poll_config_file)
+
+    store.subscribe(lambda event, name, proj: post(on_config_change, event, name, proj))
+
+    verify_reports = {}
+    badges = {}
+
+    def set_badge(name, text, fg):
+        badges[name] = (text, fg)
+        card = cards.get(name)
+        if card:
+            card.badge.config(text=text, fg=fg)
+
+    def show_reports(name, reports):
+        from services.verifier import drifted
+        verify_reports[name] = reports
+        bad = {dest: r for dest, r in reports.items() if drifted(r)}
+        for dest, r in bad.items():
+            log(f"[VERIFY] {name} -> {dest}: " + (r["error"] or f"{len(r['missing'])} missing, {len(r['modified'])} modified, {len(r['extra'])} extra"))
+        if bad:
+            post(set_badge, name, f"⚠ Drift in {len(bad)} destination(s)", "#e06c75")
+        else:
+            post(set_badge, name, "✔ In sync", "#98c379")
+
+    def mark_synced(name):
+        # Reports from before the sync would offer to "repair" files the new build added
+        verify_reports.pop(name, None)
+        set_badge(name, "✔ In sync", "#98c379")
+
+    def verify_via_daemon(name, repair):
+        # The daemon owns the destinations while it runs, so its job queue does the checking and repairing
+        def wait_for_daemon():
+            try:
+                job_id = daemon.verify(name, repair)["job"]
+                post(set_badge, name, "🔧 Repairing..." if repair else "🔍 Verifying...", "#e5c07b")
+                wait_for_job(job_id)
+                result = daemon.status().get(name, {}).get("verify")
+            except OSError as e:
+                log(f"[ERROR] {name}: daemon request failed: {e}")
+                post(set_badge, name, "⚠ Verify failed", "#e06c75")
+                return
+            if not result or result["error"]:
+                post(set_badge, name, "⚠ Verify failed", "#e06c75")
+            else:
+                show_reports(name, result["reports"])
+
+        threading.Thread(target=wait_for_daemon, daemon=True).start()
+
+    def verify_project(name, repair=False):
+        proj = store.get(name)
+        if proj is None:
+            return
+        if not daemon_state["checked"]:
+            daemon_state["pending"].append(lambda: verify_project(name, repair))
+            return
+        if daemon_state["running"]:
+            verify_via_daemon(name, repair)
+            return
+
+        def do_verify(cancel_event):
+            from services.verifier import verify_library, repair_library
+            try:
+                if repair:
+                    post(set_badge, name, "🔧 Repairing...", "#e5c07b")
+                    # Fresh reports: the ones behind the badge may predate later syncs
+                    results = repair_library(proj, verify_library(proj))
+                    for dest, result in results.items():
+                        if not result["ok"]:
+                            log(f"[ERROR] {dest}: {result['error']}")
+                post(set_badge, name, "🔍 Verifying...", "#e5c07b")
+                reports = verify_library(proj)
+            except Exception as e:
+                log(f"[ERROR] Verify {name}: {e}")
+                post(set_badge, name, "⚠ Verify failed", "#e06c75")
+                return
+            show_reports(name, reports)
+
+        # Same key as syncs, so a check never reads a destination while it is being written
+        job_queue.submit(name, do_verify, PRIORITY_LOW, label=f"{'repair' if repair else 'verify'} {name}")
+
+    def on_badge_click(name):
+        from services.verifier import drifted
+        bad = {dest: r for dest, r in verify_reports.get(name, {}).items() if drifted(r) and not r["error"]}
+        if not bad:
+            verify_project(name)
+            return
+        details = "\n".join(
+            f"{dest}: {len(r['missing'])} missing, {len(r['modified'])} modified, {len(r['extra'])} extra" for dest, r in bad.items()
+        )
+        if messagebox.askyesno("Repair Destinations", f"{name} has drifted:\n\n{details}\n\nRepair only the drifted files?"):
+            verify_project(name, repair=True)
+
+    def verify_all():
+        try:
+            libraries = store.libraries()
+        except (ConfigError, ValueError, OSError):
+            return
+        for proj in libraries:
+            verify_project(proj['name'])
+
+    def follow_daemon_logs():
+        try:
+            for line in daemon.follow_logs(since=daemon.logs()["seq"]):
+                log(line)
+        except OSError:
+            log("[WARN] Lost connection to the LocalLibSync daemon.")
+
+    def wait_for_job(job_id, on_running=None):
+        # Follows our own daemon job, not the library: an earlier job for it may still be running
+        while True:
+            time.sleep(0.5)
+            job = daemon.job(job_id)
+            if job["state"] == "running" and on_running:
+                on_running()
+            elif job["state"] not in ("queued", "running"):
+                return job
+
+    def sync_via_daemon(proj, label, progress):
+        name = proj['name']
+
+        def show_phase():
+            state = daemon.status().get(name, {}).get("state")
+            if state == "building":
+                post(set_card, label, progress, f"🔄 {name} - Building...", "#e5c07b", mode="indeterminate")
+            elif state == "syncing":
+                post(set_card, label, progress, f"🔄 {name} - Syncing...", "#61afef", 50)
+
+        def wait_for_daemon():
+            try:
+                job_id = daemon.sync(name)["job"]
+                post(set_card, label, progress, f"⏳ {name} - Queued on daemon...", "#e5c07b", 0)
+                job = wait_for_job(job_id, show_phase)
+                state = job["result"] if job["state"] == "done" else job["state"]
+                if state == STATUS_OK:
+                    post(set_card, label, progress, f"✅ {name} - Sync Complete!", "#98c379", 100)
+                    post(mark_synced, name)
+                elif state == STATUS_CANCELLED:
+                    post(set_card, label, progress, f"📚 {name}", "#61afef", 0)
+                elif state == STATUS_BUILD_FAILED:
+                    post(set_card, label, progress, f"❌ {name} - Build Failed!", "#e06c75", 0)
+                else:
+                    post(set_card, label, progress, f"❌ {name} - Sync Failed!", "#e06c75", 0)
+            except OSError as e:
+                log(f"[ERROR] {name}: daemon request failed: {e}")
+                post(set_card, label, progress, f"📚 {name}", "#61afef", 0)
+
+        threading.Thread(target=wait_for_daemon, daemon=True).start()
+
+    def start_sync(name):
+        proj = store.get(name)
+        card = cards.get(name)
+        if proj is None or card is None:
             return
-        for i, proj in enumerate(projects):
-            card = tk.Frame(project_frame, bg="#23272e", bd=0, relief="flat", padx=0, pady=0)
-            card.pack(fill=tk.X, pady=8, padx=0)
-
-            # Animated border
-            border = tk.Frame(card, bg="#61afef", height=3)
-            border.pack(fill=tk.X, side=tk.TOP)
-
-            content = tk.Frame(card, bg="#282c34", bd=2, relief="ridge", padx=10, pady=8)
-            content.pack(fill=tk.X)
-
-            # Row layout
-            label = tk.Label(
-                content,
-                text=f"📚 {proj.get('name', 'Unnamed')}",
-                font=("Segoe UI", 13, "bold"),
-                bg="#282c34",
-                fg="#61afef"
-            )
-            label.grid(row=0, column=0, sticky="w", padx=(0, 18))
-
-            dests = "\n".join([f"→ {d}" for d in proj.get('destinations', [])])
-            dest_label = tk.Label(
-                content,
-                text=dests,
-                font=("Segoe UI", 10),
-                bg="#282c34",
-                fg="#abb2bf",
-                justify="left"
-            )
-            dest_label.grid(row=0, column=1, sticky="w", padx=(0, 18))
-
-            progress = ttk.Progressbar(content, orient="horizontal", length=120, mode="determinate")
-            progress.grid(row=0, column=2, padx=(0, 18))
-
-            sync_btn = ttk.Button(content, text="🔄", width=3, command=lambda idx=i: start_sync(idx))
-            sync_btn.grid(row=0, column=3, padx=2)
-            ToolTip(sync_btn, "Build and sync this library to all destinations")
-
-            edit_btn = ttk.Button(content, text="✏️", width=3, command=lambda idx=i: edit_project(idx))
-            edit_btn.grid(row=0, column=4, padx=2)
-            ToolTip(edit_btn, "Edit this library")
-
-            del_btn = ttk.Button(content, text="🗑", width=3, command=lambda idx=i: remove_project(idx))
-            del_btn.grid(row=0, column=5, padx=2)
-            ToolTip(del_btn, "Remove this library")
-
-            content.grid_columnconfigure(1, weight=1)
-            card.progress = progress
-            card.label = label
-
-    def start_sync(idx):
-        proj = projects[idx]
-        card = project_frame.winfo_children()[idx]
         progress = card.progress
         label = card.label
+        if not daemon_state["checked"]:
+            # Until we know whether a daemon owns the builds, running one here could build twice
+            daemon_state["pending"].append(lambda: start_sync(name))
+            set_card(label, progress, f"⏳ {name} - Waiting for daemon check...", "#e5c07b", 0)
+            return
+        if daemon_state["running"]:
+            sync_via_daemon(proj, label, progress)
+            return
+        from services.syncer import sync_output, snapshot_output
+        from services.builder import build_library
+
+        def sync_progress(done, total):
+            post(set_card, label, progress, f"🔄 {name} - Syncing ({done}/{total})...", "#61afef", 50 + 50 * done / max(total, 1))
 
-        def do_sync():
+        requested = time.time()
+
+        def do_sync(cancel_event):
+            run = SyncRun(name, "gui", requested, requested)
             try:
-                # Animation: progress bar fill
-                progress["value"] = 0
-                label.config(text=f"🔄 {proj['name']} - Starting Sync...", fg="#e5c07b")
-                for i in range(0, 101, 2):
-                    progress["value"] = i
-                    root.update_idletasks()
-                    time.sleep(0.008)
-                # Step 1: Build
-                label.config(text=f"🔄 {proj['name']} - Building...", fg="#e5c07b")
-                log(f"[BUILD] Building {proj['name']}...")
-                success, build_output = build_library(proj)
-                log(build_output)
+                # Step 1: Build (no way to know how far along it is, so the bar just pulses)
+                post(set_card, label, progress, f"🔄 {name} - Building...", "#e5c07b", 0, "indeterminate")
+                log(f"[BUILD] Building {name}...")
+                before = snapshot_output(proj)
+                with run.span("build"):
+                    success, _ = build_library(proj, on_line=log, cancel_event=cancel_event)
+                if cancel_event.is_set():
+                    run.finish(STATUS_CANCELLED)
+                    log(f"[INFO] {name} cancelled.")
+                    post(set_card, label, progress, f"📚 {name}", "#61afef", 0)
+                    return
                 if not success:
-                    label.config(text=f"❌ {proj['name']} - Build Failed!", fg="#e06c75")
-                    log(f"[ERROR] Build failed for {proj['name']}. Sync aborted.")
-                    progress["value"] = 0
+                    run.finish(STATUS_BUILD_FAILED)
+                    log(f"[ERROR] Build failed for {name}. Sync aborted.")
+                    post(set_card, label, progress, f"❌ {name} - Build Failed!", "#e06c75", 0)
                     return
-                progress["value"] = 33
-                root.update_idletasks()
-                time.sleep(0.3)
-                # Step 2: Sync to all destinations
-                label.config(text=f"🔄 {proj['name']} - Syncing...", fg="#61afef")
-                for dest in proj['destinations']:
-                    log(f"[SYNC] Syncing {proj['name']} to {dest}...")
-                    proj_copy = proj.copy()
-                    proj_copy['destinations'] = [dest]
-                    sync_output(proj_copy)
-                progress["value"] = 66
-                root.update_idletasks()
-                time.sleep(0.3)
+                # Step 2: Sync to all destinations, progress follows files actually published
+                post(set_card, label, progress, f"🔄 {name} - Syncing...", "#61afef", 50)
+                log(f"[SYNC] Syncing {name} to {len(proj['destinations'])} destination(s)...")
+                with run.span("sync"):
+                    results = sync_output(proj, on_progress=sync_progress, before=before)
+                run.add_sync_results(results)
+                for dest, result in results.items():
+                    if result["ok"]:
+                        log(f"[SYNC] {dest}: {result['copied']} published, {result['removed']} removed.")
+                    else:
+                        log(f"[ERROR] {dest}: {result['error']}")
                 # Step 3: Done
-                label.config(text=f"✅ {proj['name']} - Sync Complete!", fg="#98c379")
-                log(f"[DONE] {proj['name']} sync complete.")
-                progress["value"] = 100
-                root.update_idletasks()
-                time.sleep(0.5)
+                record = run.finish(sync_status(results))
+                spans = record['spans']
+                log(f"[DONE] {name}: queued {spans.get('queue_wait', 0):.2f}s, build {spans.get('build', 0):.2f}s, sync {spans.get('sync', 0):.2f}s, total {spans['total']:.2f}s.")
+                if record['status'] != STATUS_OK:
+                    post(set_card, label, progress, f"❌ {name} - Sync Failed!", "#e06c75", 0)
+                else:
+                    log(f"[DONE] {name} sync complete.")
+                    post(set_card, label, progress, f"✅ {name} - Sync Complete!", "#98c379", 100)
+                    post(mark_synced, name)
             except Exception as e:
-                log(f"[ERROR] {proj['name']}: {e}")
-                label.config(text=f"❌ {proj['name']} - Error!", fg="#e06c75")
-            finally:
-                label.config(text=f"📚 {proj['name']}", fg="#61afef")
-                progress["value"] = 0
+                log(f"[ERROR] {name}: {e}")
+                post(set_card, label, progress, f"❌ {name} - Error!", "#e06c75", 0)
 
-        threading.Thread(target=do_sync, daemon=True).start()
+        job = job_queue.submit(name, do_sync, PRIORITY_HIGH)
+        if job.state == "queued":
+            set_card(label, progress, f"⏳ {name} - Queued...", "#e5c07b", 0)
 
     def simple_input(prompt):
         win = tk.Toplevel(root)
@@ -444,10 +841,48 @@ def launch_app():
     btn_frame = tk.Frame(main_frame, bg="#23272e")
     btn_frame.pack(fill=tk.X, pady=(0, 10))
     ttk.Button(btn_frame, text="➕ Add New Project", command=add_project).pack(side=tk.LEFT, padx=5)
-    ttk.Button(btn_frame, text="🔄 Reload Projects", command=refresh_list).pack(side=tk.LEFT, padx=5)
+    ttk.Button(btn_frame, text="🔄 Reload Projects", command=check_config_file).pack(side=tk.LEFT, padx=5)
+    ttk.Button(btn_frame, text="🔍 Verify All", command=verify_all).pack(side=tk.LEFT, padx=5)
+
+    daemon = None
+    # pending holds sync/verify clicks made before the daemon check finished; they run once it has
+    daemon_state = {"running": False, "checked": False, "pending": []}
+
+    def daemon_checked(running):
+        daemon_state["running"] = running
+        daemon_state["checked"] = True
+        pending, daemon_state["pending"] = daemon_state["pending"], []
+        for action in pending:
+            action()
+
+    def connect_daemon():
+        nonlocal daemon
+        from services.daemon_client import DaemonClient
+        daemon = DaemonClient()
+        running = daemon.is_running()
+        post(daemon_checked, running)
+        if running:
+            log("[INFO] Connected to the LocalLibSync daemon; builds run there.")
+            follow_daemon_logs()
+
+    threading.Thread(target=connect_daemon, daemon=True).start()
+    threading.Thread(
+        target=probe_versions, args=(lambda v: post(version_label.config, text=version_text(v)),), daemon=True
+    ).start()
 
     refresh_list()
+    root.after(VERIFY_DELAY_MS, verify_all)
+    root.after(CONFIG_POLL_INTERVAL_MS, poll_config_file)
+    if os.environ.get("LOCALLIBSYNC_STARTUP_PROBE"):
+        # Used by benchmarks/bench_startup.py: report once the first frame is drawn, then quit
+        def report_first_paint():
+            print("[STARTUP] first paint", flush=True)
+            root.destroy()
+        root.after_idle(report_first_paint)
+    refresh_queue_view()
+    drain_ui_events()
     root.mainloop()
+    job_queue.shutdown()
 
 if __name__ == "__main__":
     launch_app()
\ No newline at end of file
@@ -1,15 +1,203 @@
+import hashlib
 import os
 import shutil
 
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+FICLONE = 0x40049409
+# hardlink and symlink share bytes with the build output, so they are only used when asked for by name
+PUBLISH_FALLBACKS = {
+    'auto': ['reflink', 'copy'],
+    'reflink': ['reflink', 'copy'],
+    'hardlink': ['hardlink', 'copy'],
+    'symlink': ['symlink', 'copy'],
+    'copy': ['copy'],
+}
+
 
 def delete_if_exists(path):
     if os.path.exists(path):
         shutil.rmtree(path)
 
 
-def copy_folder(src, dest):
-    shutil.copytree(src, dest)
+def copy_folder(src, dest, strategy='copy'):
+    shutil.copytree(src, dest, copy_function=lambda s, d: publish_file(s, d, strategy))
 
 
 def ensure_folder(path):
     os.makedirs(path, exist_ok=True)
+
+
+def scan_tree(root, path_filter=None):
+    # Maps relative file path -> (size, mtime_ns) for every file under root
+    entries = {}
+    if not os.path.isdir(root):
+        return entries
+    stack = [root]
+    while stack:
+        current = stack.pop()
+        with os.scandir(current) as it:
+            for entry in it:
+                rel = os.path.relpath(entry.path, root).replace(os.sep, '/')
+                if entry.is_dir(follow_symlinks=False):
+                    if path_filter is None or not path_filter.excludes_dir(rel):
+                        stack.append(entry.path)
+                    continue
+                if path_filter is not None and not path_filter.matches(rel):
+                    continue
+                st = entry.stat()
+                entries[rel] = (st.st_size, st.st_mtime_ns)
+    return entries
+
+
+def file_hash(path, chunk_size=1024 * 1024):
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def remove_file(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def clear_target(dest):
+    # Makes room for a file at dest: creates its parents, removing a file that sits where one of them
+    # must go, and removes whatever is at dest itself (a file, a link, or a folder the build replaced)
+    parent = os.path.dirname(dest)
+    if parent:
+        try:
+            os.makedirs(parent, exist_ok=True)
+        except (FileExistsError, NotADirectoryError):
+            blocker = parent
+            while not os.path.lexists(blocker):
+                blocker = os.path.dirname(blocker)
+            remove_file(blocker)
+            os.makedirs(parent, exist_ok=True)
+    if os.path.isdir(dest) and not os.path.islink(dest):
+        shutil.rmtree(dest)
+    else:
+        remove_file(dest)
+
+
+def prune_empty_dirs(root):
+    for current, _, _ in os.walk(root, topdown=False):
+        if current != root and not os.listdir(current):
+            try:
+                os.rmdir(current)
+            except OSError:
+                pass
+
+
+def copy_file_multi(src, dests, chunk_size=1024 * 1024):
+    # Reads src once and writes every chunk to all dests; returns {dest: error} for failed targets
+    errors = {}
+    handles = {}
+    for dest in dests:
+        try:
+            # Never write through an existing link into the build output
+            clear_target(dest)
+            handles[dest] = open(dest, 'wb')
+        except OSError as e:
+            errors[dest] = e
+    try:
+        with open(src, 'rb') as f:
+            for chunk in iter(lambda: f.read(chunk_size), b''):
+                for dest, handle in list(handles.items()):
+                    try:
+                        handle.write(chunk)
+                    except OSError as e:
+                        errors[dest] = e
+                        handle.close()
+                        del handles[dest]
+    finally:
+        for handle in handles.values():
+            handle.close()
+    for dest in handles:
+        try:
+            shutil.copystat(src, dest)
+        except OSError as e:
+            errors[dest] = e
+    return errors
+
+
+def sibling_path(path, tag):
+    parent, name = os.path.split(os.path.normpath(path))
+    return os.path.join(parent, f".{name}.{tag}-{os.getpid()}")
+
+
+def swap_into_place(staging, dest):
+    # Both paths share a parent, so each rename is atomic on the same filesystem
+    if not os.path.lexists(dest):
+        os.rename(staging, dest)
+        return
+    old = sibling_path(dest, "old")
+    delete_if_exists(old)
+    os.rename(dest, old)
+    try:
+        os.rename(staging, dest)
+    except OSError:
+        os.rename(old, dest)
+        raise
+    shutil.rmtree(old, ignore_errors=True)
+
+
+def reflink_file(src, dest):
+    if fcntl is None:
+        raise OSError("reflink is not supported on this platform")
+    try:
+        with open(src, 'rb') as s, open(dest, 'wb') as d:
+            fcntl.ioctl(d.fileno(), FICLONE, s.fileno())
+    except OSError:
+        remove_file(dest)
+        raise
+    shutil.copystat(src, dest)
+
+
+def publish_file(src, dest, strategy='copy'):
+    clear_target(dest)
+    if strategy == 'hardlink':
+        os.link(src, dest)
+    elif strategy == 'symlink':
+        os.symlink(os.path.abspath(src), dest)
+    elif strategy == 'reflink':
+        reflink_file(src, dest)
+    else:
+        shutil.copy2(src, dest)
+    return dest
+
+
+def publish_mode(config, dest):
+    return config.get('publish_modes', {}).get(dest, config.get('publish_mode', 'auto'))
+
+
+def probe_strategy(sample, dest_dir, requested='auto'):
+    # Tries each candidate on a real source file and returns the first one the filesystems accept
+    candidates = PUBLISH_FALLBACKS.get(requested, ['copy'])
+    if sample is None:
+        return candidates[0]
+    os.makedirs(dest_dir, exist_ok=True)
+    probe = os.path.join(dest_dir, f".locallibsync-probe-{os.getpid()}")
+    for strategy in candidates[:-1]:
+        try:
+            publish_file(sample, probe, strategy)
+            return strategy
+        except OSError:
+            continue
+        finally:
+            remove_file(probe)
+    return candidates[-1]
+
+
+def first_file(root):
+    for current, _, files in os.walk(root):
+        if files:
+            return os.path.join(current, files[0])
+    return None
@@ -0,0 +1,108 @@
+import os
+import re
+
+DEFAULT_EXCLUDES = ["node_modules", ".git", ".angular", ".cache", "*.swp", "*~", ".DS_Store"]
+
+
+def glob_to_regex(pattern):
+    pattern = pattern.strip().strip('/')
+    out = []
+    i = 0
+    while i < len(pattern):
+        if pattern.startswith('**/', i):
+            out.append('(?:.*/)?')
+            i += 3
+        elif pattern.startswith('**', i):
+            out.append('.*')
+            i += 2
+        elif pattern[i] == '*':
+            out.append('[^/]*')
+            i += 1
+        elif pattern[i] == '?':
+            out.append('[^/]')
+            i += 1
+        else:
+            out.append(re.escape(pattern[i]))
+            i += 1
+    body = ''.join(out)
+    # Patterns without a slash match at any depth, like .gitignore; a match also covers everything below it
+    prefix = '' if '/' in pattern else '(?:.*/)?'
+    return f'{prefix}{body}(?:/.*)?'
+
+
+def static_prefix(pattern):
+    # Leading directories of a glob that contain no wildcards; '' means the pattern can match anywhere
+    pattern = pattern.strip().strip('/')
+    if '/' not in pattern:
+        return ''
+    parts = []
+    for part in pattern.split('/')[:-1]:
+        if any(c in part for c in '*?'):
+            break
+        parts.append(part)
+    return '/'.join(parts)
+
+
+def compile_globs(patterns):
+    patterns = [p for p in patterns if p and p.strip()]
+    if not patterns:
+        return None
+    return re.compile('(?:' + '|'.join(glob_to_regex(p) for p in patterns) + r')\Z')
+
+
+class PathFilter:
+    def __init__(self, root, include=(), exclude=(), exclude_paths=()):
+        self.root = os.path.abspath(root)
+        self.include_patterns = [p for p in include if p and p.strip()]
+        self.include = compile_globs(include)
+        self.exclude = compile_globs(exclude)
+        self.exclude_paths = tuple(os.path.abspath(p) for p in exclude_paths if p)
+
+    def relative(self, path):
+        if not os.path.isabs(path):
+            return path.replace(os.sep, '/')
+        return os.path.relpath(path, self.root).replace(os.sep, '/')
+
+    def _under_excluded_path(self, path):
+        if not os.path.isabs(path):
+            path = os.path.join(self.root, path)
+        for excluded in self.exclude_paths:
+            if path == excluded or path.startswith(excluded + os.sep):
+                return True
+        return False
+
+    def excludes_dir(self, path):
+        if self._under_excluded_path(path):
+            return True
+        rel = self.relative(path)
+        return bool(self.exclude and self.exclude.match(rel))
+
+    def watch_roots(self):
+        # Smallest set of existing directories that covers every include glob
+        prefixes = sorted({static_prefix(p) for p in self.include_patterns}) or ['']
+        roots = []
+        for prefix in prefixes:
+            path = os.path.join(self.root, prefix) if prefix else self.root
+            while not os.path.isdir(path) and path != self.root:
+                path = os.path.dirname(path)
+            if not any(path == r or path.startswith(r + os.sep) for r in roots):
+                roots = [r for r in roots if not r.startswith(path + os.sep)] + [path]
+        return roots
+
+    def matches(self, path):
+        if self._under_excluded_path(path):
+            return False
+        rel = self.relative(path)
+        if rel.startswith('../'):
+            return False
+        if self.exclude and self.exclude.match(rel):
+            return False
+        return self.include is None or bool(self.include.match(rel))
+
+
+def path_filter_for(config):
+    exclude = list(config.get('exclude', []))
+    if config.get('use_default_excludes', True):
+        exclude = DEFAULT_EXCLUDES + exclude
+    exclude_paths = [config.get('build_output')] + list(config.get('destinations', []))
+    return PathFilter(config['src'], config.get('include', []), exclude, exclude_paths)